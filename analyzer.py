@@ -1,20 +1,110 @@
-import yfinance as yf
 import pandas as pd
-from ta.momentum import RSIIndicator
-from ta.trend import MACD
-from ta.volatility import BollingerBands
-import requests
-from bs4 import BeautifulSoup
+import numpy as np
 import os
 import re
-import google.generativeai as genai
 from datetime import datetime
-import pytz
 import json
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http_client import HttpClient
+from cache import TTLCache, LookupCache
+from naver import NaverQuotePage, QUOTE_PAGE_URL, NEWS_PAGE_URL, extract_news_links, naver_code
+from price_store import PriceStore
+from indicators import INDICATOR_COLUMNS, IndicatorState, compute_indicators
+from gemini import ModelSelector, TICKER_MODEL_TARGETS, REPORT_MODEL_TARGETS, _key_id
+from singleflight import SingleFlight
+from report_cache import ReportCache, report_key
+from symbols import default_index
+from screener import download_closes, screen_closes, DEFAULT_CHUNK_SIZE, DEFAULT_MAX_WORKERS
+from instrumentation import TRACER
+from lazy_import import LazyModule
+from resilience import Upstreams
+from quotes import QuoteTable
+from compact import memory_report, pack
+from timeframes import clamp_period, frame_version, is_intraday, plan, resample_ohlcv
+
+# yfinance and pytz cost ~0.6s to import; load them on the first lookup instead of at module import
+yf = LazyModule('yfinance')
+pytz = LazyModule('pytz')
+
+# Headlines change slowly; a price refresh within this window reuses the last news fetch
+NEWS_TTL = 600
+
+# Per-stage deadlines (seconds) for StockAnalyzer.analyze, measured from when a worker starts the stage
+STAGE_TIMEOUTS = {'name': 8, 'history': 15, 'quote': 8, 'news': 10}
+
+# Longest a stage may wait in the executor queue before it is reported as timed out
+STAGE_QUEUE_TIMEOUT = 30
+
+# Stage workers shared by every session in the process (up to 4 stages per request)
+STAGE_WORKERS = int(os.environ.get('STOCK_ANALYZER_WORKERS', 32))
+
+AI_MODEL_ERROR = "AI Analysis Error: Could not find or access a compatible Gemini model. (Last Error: {last_error}). Please ensure your API key has 'Generative Language API' enabled in Google Cloud Console."
+
+# name -> ticker and ticker -> company name, shared by every analyzer (and Streamlit session) in the process
+TICKER_LOOKUPS = LookupCache(maxsize=4096, ttl=24 * 3600, negative_ttl=300)
+COMPANY_NAME_LOOKUPS = LookupCache(maxsize=4096, ttl=24 * 3600, negative_ttl=300)
+
+# Identical upstream calls from concurrent sessions share one in-flight request
+FLIGHTS = SingleFlight()
+
+# Rate limits and circuit breakers per upstream, shared so one tripped circuit protects every session
+UPSTREAMS = Upstreams()
+
+def report_inputs(df, news):
+    """(price_info, technicals, news) strings the AI report is built from; shared so report cache keys match."""
+    latest = df.iloc[-1]
+    p_info = f"Price: {latest['Close']:.2f}, Volume: {latest['Volume']}"
+    t_info = f"RSI: {latest['RSI']:.2f}, MACD: {latest['MACD']:.2f}, BB-Mid: {latest['BB_Mid']:.2f}"
+    n_info = " | ".join([n['title'] for n in news[:5]])
+    return p_info, t_info, n_info
+
+class ReportError(Exception):
+    """No Gemini model produced a report (bad key, exhausted quota, open circuit, ...)."""
 
 class StockAnalyzer:
-    def __init__(self):
-        pass
+    """Long-lived, thread-safe service object: one instance can serve every session in a process.
+
+    All per-request inputs are method arguments; the only state is pools and caches, each of which
+    does its own locking.
+    """
+    def __init__(self, http=None, store=None, symbols=None, ticker_lookups=None, name_lookups=None, flights=None, tracer=None, upstreams=None,
+                 max_workers=STAGE_WORKERS):
+        # One pooled session per analyzer; reuses TCP+TLS connections to Naver / Google News
+        self.http = http or HttpClient()
+        # Offline name -> ticker index (KRX + US symbol master), consulted before any network lookup
+        self.symbols = symbols if symbols is not None else default_index()
+        self.ticker_lookups = ticker_lookups or TICKER_LOOKUPS
+        self.name_lookups = name_lookups or COMPANY_NAME_LOOKUPS
+        self.flights = flights or FLIGHTS
+        # Stage timings and fallback counters; process-wide by default so /metrics sees every session
+        self.tracer = tracer or TRACER
+        # Per-upstream rate limits and circuit breakers around every Yahoo / Naver / Google / Gemini call
+        self.upstreams = upstreams or UPSTREAMS
+        # Parsed Naver item/main pages, shared by name lookup and the live price patch
+        self._quote_pages = TTLCache(maxsize=512, ttl=15)
+        # Live bars kept fresh by a QuotePoller for watched tickers; read instead of scraping per request
+        self.quotes = QuoteTable()
+        self._news = TTLCache(maxsize=1024, ttl=NEWS_TTL)
+        # Weekly/monthly/hourly bars derived from the finer series, keyed by the source frame's version;
+        # held as PackedFrames (float32 prices, no empty corporate-action columns)
+        self._resampled = TTLCache(maxsize=512, ttl=3600)
+        # On-disk Yahoo history, refreshed incrementally; store=False always downloads the full period
+        self.store = PriceStore() if store is None else (store or None)
+        # ticker -> (base key, indicator block, IndicatorState) for all bars before the latest one
+        self._indicator_states = TTLCache(maxsize=512, ttl=24 * 3600)
+        # Gemini model discovery / last-good model per API key
+        self.models = ModelSelector(tracer=self.tracer, upstreams=self.upstreams)
+        # Generated reports keyed by a hash of their inputs, so identical requests share one Gemini call
+        self.reports = ReportCache()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analyzer')
+
+    @contextmanager
+    def _upstream(self, span, **labels):
+        """Waits for the span's upstream rate limit ('yahoo.history' -> 'yahoo'), then times the call."""
+        with self.upstreams.guard(span.split('.')[0]), self.tracer.span(span, **labels):
+            yield
 
     def get_ticker(self, name, api_key=None):
         """Attempts to convert a company name to a ticker with AI fallback."""
@@ -23,9 +113,20 @@ class StockAnalyzer:
             return f"{name}.KS"
         if "." in name or (name.isupper() and 1 <= len(name) <= 5):
             return name
+        symbol = self.symbols.resolve(name)
+        if symbol:
+            self.tracer.event('ticker.resolved', source='symbol_index')
+            return symbol
+        # Misses are cached briefly; a key without an API key can't reuse the AI-backed answer
+        ticker = self.ticker_lookups.get_or_fetch((name.lower(), bool(api_key)), lambda: self._search_ticker(name, api_key))
+        return ticker or name
+
+    def _search_ticker(self, name, api_key=None):
+        """Yahoo search, then Gemini; None if neither finds a ticker."""
         is_korean = bool(re.search('[가-힣]', name))
         try:
-            search = yf.Search(name, max_results=5)
+            with self._upstream('yahoo.search'):
+                search = yf.Search(name, max_results=5)
             if search.quotes:
                 if is_korean:
                     for quote in search.quotes:
@@ -35,102 +136,264 @@ class StockAnalyzer:
         except: pass
         if api_key and len(name) > 1:
             try:
-                genai.configure(api_key=api_key)
+                self.tracer.event('ticker.resolved', source='gemini')
                 prompt = f"Find the stock ticker for company '{name}'. Respond ONLY with the ticker symbol (e.g. 005930.KS or AAPL)."
-                
-                # Intelligent model discovery
-                try:
-                    available_models = [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
-                except:
-                    available_models = ['models/gemini-1.5-flash', 'models/gemini-pro']
-                
-                # Try discovery-based models first, prioritizing flash
-                priority_list = [am for am in available_models if '1.5-flash' in am] + \
-                                [am for am in available_models if 'pro' in am] + \
-                                available_models
-                
-                for model_name in priority_list:
-                    try:
-                        model = genai.GenerativeModel(model_name)
-                        response = model.generate_content(prompt)
-                        ticker = response.text.strip()
-                        if ticker and len(ticker) <= 15: return ticker
-                        break
-                    except:
-                        continue
+                response, _ = self.models.generate(api_key, prompt, targets=TICKER_MODEL_TARGETS)
+                ticker = response.text.strip()
+                if ticker and len(ticker) <= 15: return ticker
             except: pass
-        return name
+        return None
 
     def get_company_name(self, ticker):
         """Returns the company name for a given ticker."""
+        return self.name_lookups.get_or_fetch(ticker, lambda: self._lookup_company_name(ticker)) or ticker
+
+    def _lookup_company_name(self, ticker):
         if ticker.endswith(('.KS', '.KQ')):
-            try:
-                code = ticker.replace('.KS', '').replace('.KQ', '')
-                url = f"https://finance.naver.com/item/main.naver?code={code}"
-                res = requests.get(url)
-                soup = BeautifulSoup(res.text, 'html.parser')
-                # Naver Finance has the company name in the 'wrap_company' div or meta tags
-                name_tag = soup.select_one('.wrap_company h2 a')
-                if name_tag:
-                    return name_tag.get_text(strip=True)
-            except: pass
+            page = self._get_naver_quote_page(ticker)
+            if page and page.name:
+                return page.name
+            self.tracer.event('company_name.fallback', source='yahoo')
         
         try:
             stock = yf.Ticker(ticker)
             # Try to get shortName or longName from yfinance
-            info = stock.info
-            return info.get('shortName') or info.get('longName') or ticker
+            with self._upstream('yahoo.info'):
+                info = stock.info
+            return info.get('shortName') or info.get('longName')
         except:
-            return ticker
+            return None
 
-    def fetch_data(self, ticker, period="1y"):
-        """Fetches historical price data using yfinance, patched with Naver for KR stocks."""
+    def fetch_data(self, ticker, period="1y", interval="1d"):
+        """Fetches historical price data using yfinance, patched with Naver for KR stocks.
+
+        Intraday intervals are clamped to Yahoo's lookback (e.g. 60d of 5m bars); weekly/monthly and
+        15m/30m/60m bars are resampled from the daily / 5m series rather than downloaded separately.
+        """
         try:
-            stock = yf.Ticker(ticker)
-            df = stock.history(period=period)
-            if ticker.endswith(('.KS', '.KQ')):
-                try:
-                    naver_data = self._fetch_naver_price(ticker)
-                    if naver_data:
-                        tz = pytz.timezone('Asia/Seoul')
-                        now = datetime.now(tz)
-                        today_ts = pd.Timestamp(now.date(), tz='Asia/Seoul')
-                        close, open_p, high, low, vol = float(naver_data['Close']), float(naver_data['Open']), float(naver_data['High']), float(naver_data['Low']), int(naver_data['Volume'])
-                        if not df.empty:
-                            last_date = df.index[-1].normalize()
-                            if last_date == today_ts.normalize():
-                                df.iloc[-1, df.columns.get_loc('Close')] = close
-                                df.iloc[-1, df.columns.get_loc('Open')] = open_p
-                                df.iloc[-1, df.columns.get_loc('High')] = high
-                                df.iloc[-1, df.columns.get_loc('Low')] = low
-                                df.iloc[-1, df.columns.get_loc('Volume')] = vol
-                            elif last_date < today_ts.normalize():
-                                new_row = pd.DataFrame([{'Open': open_p, 'High': high, 'Low': low, 'Close': close, 'Volume': vol, 'Dividends': 0.0, 'Stock Splits': 0.0}], index=[today_ts])
-                                df = pd.concat([df, new_row])
-                except: pass
+            period = clamp_period(period, interval)
+            source, rule = plan(period, interval)
+            df = self._fetch_history(ticker, period, source)
+            live = self._live_quote(ticker)
+            if live is None and ticker.endswith(('.KS', '.KQ')):
+                live = self._fetch_naver_price(ticker)
+            if live is not None or ticker.endswith(('.KS', '.KQ')):
+                df = self._apply_naver_patch(df, live, interval=source)
             if df.empty: return None, f"No data found for {ticker}"
-            return df, None
+            return self._resample(ticker, df, period, interval, rule), None
         except Exception as e: return None, str(e)
 
-    def calculate_indicators(self, df):
-        """Calculates RSI, MACD, and Bollinger Bands."""
+    def _fetch_history(self, ticker, period="1y", interval="1d"):
+        # Callers mutate the frame (live patch, indicators), so each gets its own copy
+        return self.flights.do(('history', ticker, period, interval), self._download_history, ticker, period, interval).copy()
+
+    def _download_history(self, ticker, period="1y", interval="1d"):
+        stock = yf.Ticker(ticker)
+        def history(**kwargs):
+            with self._upstream('yahoo.history', kind='tail' if 'start' in kwargs else 'full', interval=interval):
+                return stock.history(**kwargs)
+        if self.store is None:
+            return history(period=period, interval=interval)
+        with self.tracer.span('price_store.get_history'):
+            return self.store.get_history(ticker, history, period=period, interval=interval)
+
+    def _resample(self, ticker, df, period, interval, rule):
+        """Coarser bars from the (patched) source frame; reused until the source's last bar changes."""
+        if rule is None: return df
+        key = (ticker, period, interval, frame_version(df))
+        bars = self._resampled.get(key)
+        if bars is None:
+            self.tracer.event('resample_cache', result='miss')
+            with self.tracer.span('resample', interval=interval):
+                bars = pack(resample_ohlcv(df, rule))
+            self._resampled.set(key, bars)
+        else:
+            self.tracer.event('resample_cache', result='hit')
+        return bars.to_frame()
+
+    def _live_quote(self, ticker):
+        quote = self.quotes.get(ticker)
+        if quote is not None: self.tracer.event('live_quote', source='table')
+        return quote
+
+    def _apply_naver_patch(self, df, naver_data, interval="1d"):
+        """Overwrites today's bar (or appends it) with the live Naver (or polled) quote.
+
+        "Today" is taken in the frame's exchange timezone. Intraday frames only get today's last bar
+        moved to the live price; a bar is never synthesized. No bar is appended on weekends or while the
+        quote still equals the last bar (holidays, before the open).
+        """
+        if not naver_data or df.empty:
+            self.tracer.event('naver_patch', result='skipped')
+            return df
+        try:
+            tz = df.index.tz or pytz.timezone('Asia/Seoul')
+            now = datetime.now(tz)
+            today_ts = pd.Timestamp(now.date(), tz=tz)
+            close, open_p, high, low, vol = float(naver_data['Close']), float(naver_data['Open']), float(naver_data['High']), float(naver_data['Low']), int(naver_data['Volume'])
+            last_date = df.index[-1].normalize()
+            if is_intraday(interval):
+                if last_date == today_ts.normalize():
+                    # Naver volume is the day's total, so the bar's own volume is left alone
+                    df.iloc[-1, df.columns.get_loc('Close')] = close
+                    df.iloc[-1, df.columns.get_loc('High')] = max(close, df['High'].iloc[-1])
+                    df.iloc[-1, df.columns.get_loc('Low')] = min(close, df['Low'].iloc[-1])
+                    self.tracer.event('naver_patch', result='intraday')
+                else:
+                    self.tracer.event('naver_patch', result='skipped')
+            elif last_date == today_ts.normalize():
+                df.iloc[-1, df.columns.get_loc('Close')] = close
+                df.iloc[-1, df.columns.get_loc('Open')] = open_p
+                df.iloc[-1, df.columns.get_loc('High')] = high
+                df.iloc[-1, df.columns.get_loc('Low')] = low
+                df.iloc[-1, df.columns.get_loc('Volume')] = vol
+                self.tracer.event('naver_patch', result='replaced')
+            elif last_date < today_ts.normalize():
+                last = df.iloc[-1]
+                # Weekends, holidays and pre-open: the quote is still the last session's, which the frame already has
+                if today_ts.dayofweek >= 5 or np.allclose([open_p, high, low, close], [last['Open'], last['High'], last['Low'], last['Close']]):
+                    self.tracer.event('naver_patch', result='stale')
+                    return df
+                new_row = pd.DataFrame([{'Open': open_p, 'High': high, 'Low': low, 'Close': close, 'Volume': vol, 'Dividends': 0.0, 'Stock Splits': 0.0}], index=[today_ts])
+                df = pd.concat([df, new_row])
+                self.tracer.event('naver_patch', result='appended')
+            else:
+                self.tracer.event('naver_patch', result='skipped')
+        except:
+            self.tracer.event('naver_patch', result='error')
+        return df
+
+    def analyze(self, symbol, api_key=None, period="1y", timeouts=None, interval="1d"):
+        """Resolves the ticker, then runs name lookup, price history, Naver live quote and news concurrently.
+
+        Each stage has its own timeout; a stage that fails or times out is reported in 'errors' and
+        the rest of the result is still returned (name falls back to the ticker, news to []).
+        """
+        with self.tracer.span('stage.ticker'):
+            ticker = self.get_ticker(symbol, api_key=api_key)
+        return self.analyze_ticker(ticker, period=period, timeouts=timeouts, interval=interval)
+
+    def analyze_ticker(self, ticker, period="1y", timeouts=None, interval="1d"):
+        """analyze() for an already-resolved ticker."""
+        timeouts = {**STAGE_TIMEOUTS, **(timeouts or {})}
+        period = clamp_period(period, interval)
+        source, rule = plan(period, interval)
+        stages = {
+            'name': (self.get_company_name, ticker),
+            'history': (self._fetch_history, ticker, period, source),
+            'news': (self.fetch_news, ticker),
+        }
+        live = self._live_quote(ticker)
+        if live is None and ticker.endswith(('.KS', '.KQ')):
+            stages['quote'] = (self._fetch_naver_price, ticker)
+        # Each stage runs in the caller's trace context so its spans land on the same waterfall
+        futures = {}
+        for stage, call in stages.items():
+            started = Future()
+            futures[stage] = (started, self._executor.submit(self.tracer.wrap(self._run_stage), stage, started, *call))
+        # One queue budget for the whole request, not one per stage waited on in turn
+        queue_deadline = time.monotonic() + STAGE_QUEUE_TIMEOUT
+
+        results, errors = {}, {}
+        for stage, (started, future) in futures.items():
+            try:
+                # Time spent queued behind other sessions' stages doesn't count against the stage's timeout
+                begin = started.result(timeout=max(0, queue_deadline - time.monotonic()))
+                results[stage] = future.result(timeout=max(0, begin + timeouts[stage] - time.monotonic()))
+            except FutureTimeoutError:
+                future.cancel()
+                errors[stage] = f"timed out after {timeouts[stage]}s" if started.done() else f"no worker free after {STAGE_QUEUE_TIMEOUT}s"
+                self.tracer.event('stage.timeout', stage=stage)
+            except Exception as e:
+                errors[stage] = str(e)
+
+        df, error = results.get('history'), None
+        if df is None or df.empty:
+            df, error = None, errors.get('history') or f"No data found for {ticker}"
+        else:
+            live = live or results.get('quote')
+            if live is not None or ticker.endswith(('.KS', '.KQ')):
+                df = self._apply_naver_patch(df, live, interval=source)
+            df = self._resample(ticker, df, period, interval, rule)
+            with self.tracer.span('stage.indicators'):
+                # Indicators are per timeframe: RSI(20) on weekly bars is a different series than on daily
+                df = self.calculate_indicators(df, ticker=(ticker, period, interval))
+        return {
+            'ticker': ticker,
+            'company_name': results.get('name') or ticker,
+            'df': df,
+            'error': error,
+            'news': results.get('news') or [],
+            'errors': errors,
+        }
+
+    def _run_stage(self, stage, started, fn, *args):
+        started.set_result(time.monotonic())
+        with self.tracer.span(f'stage.{stage}'):
+            return fn(*args)
+
+    def calculate_indicators(self, df, ticker=None):
+        """Calculates RSI, MACD, and Bollinger Bands.
+
+        With a ticker (or any cache key, e.g. (ticker, period, interval)), the math over every bar but the
+        latest is cached and the latest bar (e.g. the Naver live patch) is folded in with an O(1)
+        IndicatorState update.
+        """
         if len(df) < 30: return df
-        df['RSI'] = RSIIndicator(close=df['Close'], window=20).rsi()
-        macd = MACD(close=df['Close'])
-        df['MACD'], df['MACD_Signal'], df['MACD_Diff'] = macd.macd(), macd.macd_signal(), macd.macd_diff()
-        bb = BollingerBands(close=df['Close'])
-        df['BB_High'], df['BB_Low'], df['BB_Mid'] = bb.bollinger_hband(), bb.bollinger_lband(), bb.bollinger_mavg()
+        close = df['Close'].to_numpy(dtype='float64')
+        if ticker is None:
+            df[list(INDICATOR_COLUMNS)] = compute_indicators(close).T
+            return df
+        base_key = (len(close) - 1, df.index[-2], close[-2])
+        cached = self._indicator_states.get(ticker)
+        self.tracer.event('indicators.base_cache', result='miss' if cached is None or cached[0] != base_key else 'hit')
+        if cached is None or cached[0] != base_key:
+            cached = (base_key, compute_indicators(close[:-1]), IndicatorState.from_closes(close[:-1]))
+            self._indicator_states.set(ticker, cached)
+        _, base_block, state = cached
+        last = state.copy().push(close[-1])
+        df[list(INDICATOR_COLUMNS)] = np.column_stack([base_block, last]).T
         return df
 
+    def memory_report(self):
+        """Bytes held per ticker by the in-process bar caches (resampled frames and indicator blocks)."""
+        entries = [(key[0], bars) for key, bars in self._resampled.items()]
+        entries += [(key[0] if isinstance(key, tuple) else key, block) for key, (_, block, _) in self._indicator_states.items()]
+        return memory_report(entries)
+
+    def screen(self, symbols, period="1y", chunk_size=DEFAULT_CHUNK_SIZE, max_workers=DEFAULT_MAX_WORKERS, progress=None):
+        """Scans many tickers for RSI extremes, MACD crossovers and Bollinger breakouts.
+
+        History is bulk-downloaded in chunks and indicators are computed across one ticker x time array.
+        Returns (ranked DataFrame, {ticker: error}).
+        """
+        tickers = list(dict.fromkeys(self.get_ticker(s) for s in symbols if s.strip()))
+        closes, errors = download_closes(tickers, self._download_chunk, period=period, chunk_size=chunk_size,
+                                         max_workers=max_workers, progress=progress)
+        return screen_closes(closes), errors
+
+    def _download_chunk(self, tickers, period):
+        with self._upstream('yahoo.download'):
+            return yf.download(tickers, period=period, auto_adjust=True, group_by='column', progress=False, threads=False)
+
     def fetch_news(self, ticker):
         """미국 주식 뉴스는 직접 링크를 제공하는 Yahoo Finance를 우선 사용하고, 한국 주식은 네이버를 사용합니다."""
+        news = self._news.get(ticker)
+        if news is None:
+            news = self.flights.do(('news', ticker), self._fetch_news, ticker)
+            # Empty results are usually upstream trouble; retry them on the next request
+            if news: self._news.set(ticker, news)
+        return [dict(item) for item in news]
+
+    def _fetch_news(self, ticker):
         if ticker.endswith(('.KS', '.KQ')):
             return self._fetch_naver_news(ticker)
         
         # 1. Yahoo Finance (Primary for US - Direct links)
         try:
             stock = yf.Ticker(ticker)
-            raw_news = stock.news
+            with self._upstream('yahoo.news'):
+                raw_news = stock.news
             processed_news = []
             for item in (raw_news or []):
                 # Handle different yfinance news structures
@@ -157,13 +420,17 @@ class StockAnalyzer:
             print(f"Yahoo Finance news error: {e}")
 
         # 2. Google News RSS (Fallback)
+        self.tracer.event('news.fallback', source='google_rss')
         try:
             clean_ticker = ticker.split('.')[0]
             search_query = f"{clean_ticker} stock"
             url = f"https://news.google.com/rss/search?q={search_query}&hl=en-US&gl=US&ceid=US:en"
             
             headers = {'User-Agent': 'Mozilla/5.0'}
-            res = requests.get(url, headers=headers, timeout=10)
+            with self._upstream('google.news_rss'):
+                res = self.http.get(url, headers=headers, timeout=10)
+                res.raise_for_status()
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(res.content, 'xml')
             items = soup.find_all('item')
             processed_news = []
@@ -194,49 +461,54 @@ class StockAnalyzer:
             return processed_news
         except: return []
 
-    def _fetch_naver_price(self, ticker):
+    def _get_naver_quote_page(self, ticker):
+        """Fetches and parses the Naver item/main page at most once per ticker per cache window."""
+        code = naver_code(ticker)
+        page = self._quote_pages.get(code)
+        if page is not None:
+            self.tracer.event('naver.quote_page_cache', result='hit')
+            return page
         try:
-            code = ticker.replace('.KS', '').replace('.KQ', '')
-            url = f"https://finance.naver.com/item/main.naver?code={code}"
-            res = requests.get(url)
-            soup = BeautifulSoup(res.text, 'html.parser')
-            dl = soup.select_one('dl.blind')
-            if not dl: return None
-            text = dl.get_text()
-            def ex(k, t):
-                m = re.search(rf"{k}\s+([\d,]+)", t)
-                return m.group(1).replace(',', '') if m else None
-            data = {k: ex(v, text) for k, v in {'Close': '현재가', 'Open': '시가', 'High': '고가', 'Low': '저가', 'Volume': '거래량'}.items()}
-            return data if all(data.values()) else None
+            return self.flights.do(('naver_quote', code), self._load_naver_quote_page, code)
         except: return None
 
+    def _load_naver_quote_page(self, code):
+        # A caller that missed the cache just as the previous download finished must not fetch the page again
+        page = self._quote_pages.get(code)
+        return page if page is not None else self._download_naver_quote_page(code)
+
+    def _download_naver_quote_page(self, code):
+        with self._upstream('naver.quote_page'):
+            res = self.http.get(QUOTE_PAGE_URL.format(code=code))
+            res.raise_for_status()
+        with self.tracer.span('naver.parse_quote'):
+            page = NaverQuotePage.parse(code, res.text)
+        self._quote_pages.set(code, page)
+        return page
+
+    def _fetch_naver_price(self, ticker):
+        page = self._get_naver_quote_page(ticker)
+        return page.ohlcv if page else None
+
     def _fetch_naver_news(self, ticker):
-        code = ticker.replace('.KS', '').replace('.KQ', '')
-        url = f"https://finance.naver.com/item/news_news.naver?code={code}&page=1"
+        code = naver_code(ticker)
+        url = NEWS_PAGE_URL.format(code=code)
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Referer': f'https://finance.naver.com/item/news.naver?code={code}'
         }
         try:
-            res = requests.get(url, headers=headers)
+            with self._upstream('naver.news'):
+                res = self.http.get(url, headers=headers)
+                res.raise_for_status()
             res.encoding = 'euc-kr'
-            soup = BeautifulSoup(res.text, 'html.parser')
-            news_items = []
-            for a in soup.select('td.title a')[:5]:
-                link = a['href']
-                if not link.startswith('http'): link = f"https://finance.naver.com{link}"
-                news_items.append({'title': a.get_text(strip=True), 'link': link})
-            return news_items
+            return extract_news_links(res.text, limit=5)
         except: return []
 
-    def generate_ai_analysis(self, ticker, price_info, technicals, news, api_key, avg_purchase_price=None, language='Korean'):
-        if not api_key: return "API Key is required."
-        try:
-            genai.configure(api_key=api_key)
-            
-            purchase_context = f"The user's average purchase price is {avg_purchase_price}." if avg_purchase_price else "The user does not currently hold this stock."
-            
-            prompt = f"""
+    def _build_report_prompt(self, ticker, price_info, technicals, news, avg_purchase_price=None, language='Korean'):
+        purchase_context = f"The user's average purchase price is {avg_purchase_price}." if avg_purchase_price else "The user does not currently hold this stock."
+        
+        return f"""
             You are a professional stock analyst. Analyze the stock '{ticker}' based on the provided data and provide a structured report in {language}.
 
             [Data Provided]
@@ -254,47 +526,71 @@ class StockAnalyzer:
 
             Ensure the tone is professional, objective, and data-driven.
             """
-            
-            # 1. Try to discover available models for this specific API key
-            available_models = []
-            try:
-                for m in genai.list_models():
-                    if 'generateContent' in m.supported_generation_methods:
-                        available_models.append(m.name)
-            except Exception as list_err:
-                # If listing fails, fall back to a safer hardcoded list
-                available_models = ['models/gemini-1.5-flash', 'models/gemini-1.5-pro', 'models/gemini-pro']
-            
-            # 2. Prioritize best models
-            # We look for 1.5-flash, then 1.5-pro, then any gemini model
-            priority_list = []
-            for target in ['1.5-flash', '1.5-pro', 'gemini-pro', '1.0-pro']:
-                for am in available_models:
-                    if target in am:
-                        priority_list.append(am)
-                        break
-            
-            # Add remaining models just in case
-            for am in available_models:
-                if am not in priority_list:
-                    priority_list.append(am)
-
-            # 3. Try to generate content with the best available model
-            last_error = "No models found"
-            for model_name in priority_list:
-                try:
-                    model = genai.GenerativeModel(model_name)
-                    response = model.generate_content(prompt)
-                    if response and response.text:
-                        return response.text
-                except Exception as e:
-                    last_error = str(e)
-                    continue # Try next available model
-            
-            return f"AI Analysis Error: Could not find or access a compatible Gemini model. (Last Error: {last_error}). Please ensure your API key has 'Generative Language API' enabled in Google Cloud Console."
+
+    def generate_ai_analysis(self, ticker, price_info, technicals, news, api_key, avg_purchase_price=None, language='Korean'):
+        """The AI report, or a displayable error message in its place (see ai_report for a raising variant)."""
+        if not api_key: return "API Key is required."
+        try:
+            return self.ai_report(ticker, price_info, technicals, news, api_key, avg_purchase_price, language)
+        except ReportError as e:
+            return AI_MODEL_ERROR.format(last_error=e)
         except Exception as e:
             return f"AI Config Error: {str(e)}"
 
+    def ai_report(self, ticker, price_info, technicals, news, api_key, avg_purchase_price=None, language='Korean'):
+        """The AI report text; raises ReportError if no Gemini model produced one."""
+        prompt = self._build_report_prompt(ticker, price_info, technicals, news, avg_purchase_price, language)
+        cache_key = report_key(ticker, price_info, technicals, news, language, avg_purchase_price)
+        cached = self.reports.get(cache_key)
+        self.tracer.event('report_cache', result='miss' if cached is None else 'hit')
+        if cached is not None: return cached
+
+        # Cached per-key model discovery; the last model that worked is tried first
+        try:
+            # Visitors asking for the same report with the same key at the same moment share one Gemini call;
+            # another key must not ride on (or be billed to) someone else's request
+            return self.flights.do(('ai_report', cache_key, _key_id(api_key)), self._generate_report, api_key, prompt, cache_key)
+        except Exception as e:
+            raise ReportError(str(e)) from e
+
+    def _generate_report(self, api_key, prompt, cache_key):
+        with self.tracer.span('stage.ai_report'):
+            response, _ = self.models.generate(api_key, prompt, targets=REPORT_MODEL_TARGETS)
+        self.reports.set(cache_key, response.text)
+        return response.text
+
+    def stream_ai_analysis(self, ticker, price_info, technicals, news, api_key, avg_purchase_price=None, language='Korean'):
+        """Same report as generate_ai_analysis, yielded as text chunks while Gemini produces them."""
+        if not api_key:
+            yield "API Key is required."
+            return
+        try:
+            prompt = self._build_report_prompt(ticker, price_info, technicals, news, avg_purchase_price, language)
+            cache_key = report_key(ticker, price_info, technicals, news, language, avg_purchase_price)
+        except Exception as e:
+            yield f"AI Config Error: {str(e)}"
+            return
+        cached = self.reports.get(cache_key)
+        self.tracer.event('report_cache', result='miss' if cached is None else 'hit')
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        start = time.perf_counter()
+        try:
+            for text in self.models.stream(api_key, prompt, targets=REPORT_MODEL_TARGETS):
+                if not parts: self.tracer.record('stage.ai_first_chunk', time.perf_counter() - start, start=start)
+                parts.append(text)
+                yield text
+        except Exception as e:
+            # Mid-stream failures keep what was already shown and are not cached
+            self.tracer.record('stage.ai_report_stream', time.perf_counter() - start, start=start, error=e)
+            yield f"\n\n{AI_MODEL_ERROR.format(last_error=e)}" if parts else AI_MODEL_ERROR.format(last_error=e)
+            return
+        self.tracer.record('stage.ai_report_stream', time.perf_counter() - start, start=start)
+        self.reports.set(cache_key, ''.join(parts))
+
 if __name__ == "__main__":
     analyzer = StockAnalyzer()
     print(analyzer.fetch_news("AAPL"))
@@ -1,7 +1,12 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-from analyzer import StockAnalyzer
+import os
+from instrumentation import TRACER, start_metrics_server
+from lazy_import import LazyModule
+
+# Plotly loads on the first chart and analyzer (pandas, yfinance, ...) in get_analyzer(), so
+# About/Privacy/Terms/Contact renders and worker cold starts skip the analysis stack
+go = LazyModule('plotly.graph_objects')
+compact = LazyModule('compact')
 
 # --- Page Config ---
 st.set_page_config(
@@ -95,6 +100,7 @@ def get_content(lang):
     contents = {
         "English": {
             "nav_home": "Home / Analyzer",
+            "nav_screener": "Screener",
             "nav_about": "Service Info",
             "nav_privacy": "Privacy Policy",
             "nav_terms": "Terms of Service",
@@ -105,6 +111,8 @@ def get_content(lang):
             "input_placeholder": "e.g., AAPL, 005930",
             "btn_analyze": "🚀 RUN AI ANALYSIS",
             "purchase_price": "Avg. Purchase Price",
+            "timeframe": "Timeframe",
+            "not_enough_bars": "Not enough bars in this timeframe to compute indicators.",
             "ad_label": "ADVERTISEMENT",
             "metric_price": "Last Close",
             "metric_rsi": "RSI (20)",
@@ -122,6 +130,15 @@ def get_content(lang):
             "latest_news": "Crucial Market News",
             "ai_report": "🤖 Institutional AI Strategy Report",
             "analyzing": "Synthesizing Data",
+            "screener_title": "🔎 Multi-Ticker Signal Screener",
+            "screener_input": "Tickers or company names (one per line or comma-separated)",
+            "screener_placeholder": "e.g., AAPL, MSFT, 005930, 000660",
+            "screener_btn": "🔎 RUN SCREENER",
+            "screener_progress": "Downloading price history",
+            "screener_empty": "No tickers returned enough data to screen.",
+            "screener_failed": "Tickers without data",
+            "debug_toggle": "Show stage timings",
+            "debug_title": "🛠 Stage waterfall (this request)",
             "features_title": "#### 📈 Key Features & Methodology",
             "features_list": """
             - **Comprehensive Technical Analysis**: Real-time RSI, MACD, and Bollinger Bands.
@@ -172,6 +189,7 @@ def get_content(lang):
         },
         "한국어": {
             "nav_home": "홈 / 분석기",
+            "nav_screener": "종목 스크리너",
             "nav_about": "서비스 소개",
             "nav_privacy": "개인정보 처리방침",
             "nav_terms": "이용약관",
@@ -182,6 +200,8 @@ def get_content(lang):
             "input_placeholder": "예: 005930, AAPL",
             "btn_analyze": "🚀 AI 심층 분석 시작",
             "purchase_price": "평균 매수 가격",
+            "timeframe": "차트 주기",
+            "not_enough_bars": "이 주기에서는 지표를 계산할 만큼 데이터가 충분하지 않습니다.",
             "ad_label": "ADVERTISEMENT",
             "metric_price": "현재가",
             "metric_rsi": "RSI (20)",
@@ -199,6 +219,15 @@ def get_content(lang):
             "latest_news": "최신 주요 뉴스",
             "ai_report": "🤖 Meta AI 전문 분석 리포트",
             "analyzing": "데이터 분석 중",
+            "screener_title": "🔎 다종목 시그널 스크리너",
+            "screener_input": "종목 코드 또는 종목명 (줄바꿈 또는 쉼표로 구분)",
+            "screener_placeholder": "예: AAPL, MSFT, 005930, 000660",
+            "screener_btn": "🔎 스크리너 실행",
+            "screener_progress": "가격 데이터 다운로드 중",
+            "screener_empty": "분석 가능한 데이터가 있는 종목이 없습니다.",
+            "screener_failed": "데이터를 가져오지 못한 종목",
+            "debug_toggle": "단계별 소요 시간 표시",
+            "debug_title": "🛠 단계별 소요 시간 (현재 요청)",
             "features_title": "#### 📈 주요 기능 및 분석 방법",
             "features_list": """
             - **심층 기술 분석**: RSI, MACD, 볼린저 밴드 등 핵심 지표 실시간 계산 및 시각화.
@@ -254,6 +283,71 @@ def get_content(lang):
 def render_ad(t):
     st.markdown(f'<div class="ad-wrapper"><div style="font-size: 10px; color: #94a3b8;">{t["ad_label"]}</div><div>[ Sponsored Area ]</div></div>', unsafe_allow_html=True)
 
+# Timeframe choice -> (period, interval); weekly/monthly/60m bars are resampled from daily / 5m data
+TIMEFRAMES = {
+    "1D · 1Y": ("1y", "1d"),
+    "1W · 5Y": ("5y", "1wk"),
+    "1M · MAX": ("max", "1mo"),
+    "60m · 60D": ("60d", "60m"),
+    "5m · 5D": ("5d", "5m"),
+}
+
+# Price results are reused across sessions for this long; the Naver live quote itself refreshes every 15s
+PRICE_TTL = 60
+
+class PartialResult(Exception):
+    """Raised out of cached_analysis so a result with failed stages is returned but not cached."""
+    def __init__(self, result):
+        super().__init__(result['errors'])
+        self.result = result
+
+@st.cache_resource
+def get_analyzer():
+    """One StockAnalyzer per process: sessions share its connection pools, caches and model choices.
+
+    With STOCK_WATCHLIST set (comma-separated), a background poller keeps those tickers' live quotes in
+    analyzer.quotes every STOCK_QUOTE_POLL_SECONDS, so their live patch needs no request-time scrape.
+    """
+    from analyzer import StockAnalyzer
+    analyzer = StockAnalyzer()
+    watchlist = [s.strip() for s in os.environ.get('STOCK_WATCHLIST', '').split(',') if s.strip()]
+    if watchlist:
+        from quotes import QuotePoller
+        QuotePoller(analyzer, watchlist, interval=float(os.environ.get('STOCK_QUOTE_POLL_SECONDS', 15))).start()
+    return analyzer
+
+@st.cache_data(ttl=PRICE_TTL, show_spinner=False, max_entries=500)
+def cached_analysis(ticker, period="1y", interval="1d"):
+    result = get_analyzer().analyze_ticker(ticker, period=period, interval=interval)
+    # Up to max_entries results stay in memory, so their bars are kept packed (see compact.py)
+    result = {**result, 'df': compact.pack(result['df'])}
+    if result['errors']: raise PartialResult(result)
+    return result
+
+@st.cache_resource
+def start_metrics(port):
+    """One /metrics endpoint per process, enabled with STOCK_METRICS_PORT."""
+    return start_metrics_server(port, TRACER)
+
+def render_trace(trace, t, upstreams=None):
+    """Waterfall of the spans recorded for one request, plus the fallback counters it hit and upstream health."""
+    with st.expander(t['debug_title'], expanded=True):
+        spans = trace.as_dict()['spans']
+        if spans:
+            labels = [s['name'] + (f" [{', '.join(f'{k}={v}' for k, v in s['labels'].items())}]" if s['labels'] else '') for s in spans]
+            fig = go.Figure(go.Bar(
+                y=labels, x=[s['duration'] * 1000 for s in spans], base=[s['start'] * 1000 for s in spans], orientation='h',
+                marker_color=['#ef4444' if s['error'] else '#3b82f6' for s in spans],
+                hovertext=[f"{s['duration'] * 1000:.1f} ms · {s['thread']}" + (f" · {s['error']}" if s['error'] else '') for s in spans]))
+            fig.update_layout(template="plotly_white", height=max(200, 28 * len(spans) + 80), xaxis_title="ms",
+                              yaxis=dict(autorange="reversed"), margin=dict(l=10, r=10, t=10, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"Total: {trace.duration * 1000:,.0f} ms")
+        if trace.events:
+            st.json(dict(trace.events))
+        if upstreams is not None:
+            st.dataframe([{'upstream': name, **stats} for name, stats in upstreams.stats().items()], use_container_width=True, hide_index=True)
+
 # --- Pages ---
 def show_home():
     t = get_content(st.session_state['lang'])
@@ -263,6 +357,7 @@ def show_home():
     with st.sidebar:
         st.header("⚙️ Setting")
         api_key = st.text_input("Gemini API Key", type="password")
+        show_debug = st.checkbox(t['debug_toggle'])
         st.divider()
         st.caption("Developed by Antigravity")
 
@@ -270,19 +365,23 @@ def show_home():
     with col1:
         symbol = st.text_input(t['input_label'], placeholder=t['input_placeholder'])
         purchase_price = st.number_input(t['purchase_price'], min_value=0.0, format="%.2f")
+        timeframe = st.selectbox(t['timeframe'], list(TIMEFRAMES))
         analyze_btn = st.button(t['btn_analyze'])
 
     if symbol and analyze_btn:
-        analyzer = StockAnalyzer()
-        with st.spinner(f"{t['analyzing']}..."):
-            resolved_ticker = analyzer.get_ticker(symbol, api_key=api_key)
-            company_name = analyzer.get_company_name(resolved_ticker)
-            df, error = analyzer.fetch_data(resolved_ticker)
+        analyzer = get_analyzer()
+        with analyzer.tracer.trace('show_home') as trace, st.spinner(f"{t['analyzing']}..."):
+            try:
+                result = cached_analysis(analyzer.get_ticker(symbol, api_key=api_key), *TIMEFRAMES[timeframe])
+            except PartialResult as e:
+                result = e.result
+            resolved_ticker, company_name = result['ticker'], result['company_name']
+            df, error, news = compact.unpack(result['df']), result['error'], result['news']
             
-            if not error:
-                df = analyzer.calculate_indicators(df)
+            if not error and 'RSI' not in df.columns:
+                st.warning(t['not_enough_bars'])
+            elif not error:
                 latest = df.iloc[-1]
-                news = analyzer.fetch_news(resolved_ticker)
                 
                 st.subheader(f"📊 {company_name} ({resolved_ticker})")
                 
@@ -293,29 +392,16 @@ def show_home():
                 m3.metric(t['metric_macd'], f"{latest['MACD']:.2f}")
                 m4.metric(t['metric_bb'], f"{latest['BB_Mid']:,.2f}")
                 
-                # 1. Price + Bollinger Bands (Improved Visibility)
-                fig_p = go.Figure()
-                fig_p.add_trace(go.Scatter(x=df.index, y=df['Close'], name=t['legend_price'], line=dict(color='#2563eb', width=3)))
-                fig_p.add_trace(go.Scatter(x=df.index, y=df['BB_High'], name=t['legend_upper'], line=dict(color='#ef4444', width=1.5)))
-                fig_p.add_trace(go.Scatter(x=df.index, y=df['BB_Low'], name=t['legend_lower'], line=dict(color='#10b981', width=1.5)))
-                fig_p.add_trace(go.Scatter(x=df.index, y=df['BB_Mid'], name=t['legend_mid'], line=dict(color='rgba(0,0,0,0.2)', width=1)))
-                fig_p.update_layout(title=t['chart_price_title'], template="plotly_white", height=450)
+                # 1. Price + Bollinger Bands (Improved Visibility); WebGL traces, downsampled and cached per data version
+                from charts import build_figures
+                fig_p, fig_r, fig_m = build_figures(df, t, key=resolved_ticker)
                 st.plotly_chart(fig_p, use_container_width=True)
 
                 # 2. Indicators
                 c1, c2 = st.columns(2)
                 with c1:
-                    fig_r = go.Figure()
-                    fig_r.add_trace(go.Scatter(x=df.index, y=df['RSI'], name='RSI', line=dict(color='#ef4444')))
-                    fig_r.add_hline(y=70, line_dash="dash", line_color="red")
-                    fig_r.add_hline(y=30, line_dash="dash", line_color="green")
-                    fig_r.update_layout(title=t['chart_rsi_title'], template="plotly_white", height=300)
                     st.plotly_chart(fig_r, use_container_width=True)
                 with c2:
-                    fig_m = go.Figure()
-                    fig_m.add_trace(go.Scatter(x=df.index, y=df['MACD'], name=t['legend_macd'], line=dict(color='#3b82f6', width=2)))
-                    fig_m.add_trace(go.Scatter(x=df.index, y=df['MACD_Signal'], name=t['legend_signal'], line=dict(color='#f59e0b', width=1.5)))
-                    fig_m.update_layout(title=t['chart_macd_title'], template="plotly_white", height=300)
                     st.plotly_chart(fig_m, use_container_width=True)
                 
                 if news:
@@ -327,13 +413,13 @@ def show_home():
                 if api_key:
                     st.divider()
                     st.subheader(t['ai_report'])
-                    p_info = f"Price: {latest['Close']:.2f}, Volume: {latest['Volume']}"
-                    t_info = f"RSI: {latest['RSI']:.2f}, MACD: {latest['MACD']:.2f}, BB-Mid: {latest['BB_Mid']:.2f}"
-                    n_info = " | ".join([n['title'] for n in news[:5]])
-                    report = analyzer.generate_ai_analysis(resolved_ticker, p_info, t_info, n_info, api_key, 
-                                                         avg_purchase_price=purchase_price if purchase_price > 0 else None,
-                                                         language=st.session_state['lang'])
-                    st.write(report)
+                    from analyzer import report_inputs
+                    p_info, t_info, n_info = report_inputs(df, news)
+                    # Render chunks as Gemini produces them instead of waiting for the full report
+                    st.write_stream(analyzer.stream_ai_analysis(resolved_ticker, p_info, t_info, n_info, api_key, 
+                                                                avg_purchase_price=purchase_price if purchase_price > 0 else None,
+                                                                language=st.session_state['lang']))
+        if show_debug: render_trace(trace, t, analyzer.upstreams)
     else:
         st.divider()
         sc1, sc2 = st.columns(2)
@@ -347,6 +433,25 @@ def show_home():
     render_ad(t)
     st.caption(t['disclaimer_title'])
 
+def show_screener():
+    t = get_content(st.session_state['lang'])
+    st.title(t['screener_title'])
+    raw = st.text_area(t['screener_input'], placeholder=t['screener_placeholder'], height=150)
+    period = st.selectbox("Period", ["6mo", "1y", "2y"], index=1)
+    if raw and st.button(t['screener_btn']):
+        symbols = [s.strip() for s in raw.replace(',', '\n').splitlines() if s.strip()]
+        bar = st.progress(0.0, text=t['screener_progress'])
+        table, errors = get_analyzer().screen(symbols, period=period, progress=lambda done, total: bar.progress(done / total, text=f"{t['screener_progress']} ({done}/{total})"))
+        bar.empty()
+        if table.empty:
+            st.warning(t['screener_empty'])
+        else:
+            st.dataframe(table, use_container_width=True, hide_index=True,
+                         column_config={c: st.column_config.NumberColumn(format="%.2f") for c in ['close', 'change_pct', 'rsi', 'macd', 'macd_signal', 'bb_pct']})
+        if errors:
+            st.caption(f"{t['screener_failed']}: {', '.join(sorted(errors))}")
+    render_ad(t)
+
 def show_about():
     t = get_content(st.session_state['lang'])
     st.title(t['nav_about'])
@@ -373,12 +478,14 @@ def show_contact():
     render_ad(t)
 
 def main():
+    if os.environ.get('STOCK_METRICS_PORT'): start_metrics(int(os.environ['STOCK_METRICS_PORT']))
     if 'lang' not in st.session_state: st.session_state['lang'] = '한국어'
     with st.sidebar:
         st.session_state['lang'] = st.radio("Language", ["English", "한국어"], index=1, horizontal=True)
     t = get_content(st.session_state['lang'])
     pg = st.navigation([
         st.Page(show_home, title=t['nav_home'], icon="🏠"),
+        st.Page(show_screener, title=t['nav_screener'], icon="🔎"),
         st.Page(show_about, title=t['nav_about'], icon="ℹ️"),
         st.Page(show_privacy, title=t['nav_privacy'], icon="🔒"),
         st.Page(show_terms, title=t['nav_terms'], icon="📄"),
@@ -0,0 +1,176 @@
+"""Vectorized backtests of the RSI / MACD / Bollinger signals the app charts.
+
+Every rule is evaluated over whole arrays: positions for k parameter sets are a (k, n) block, and a
+grid sweep computes each indicator setting once and scores all its threshold combinations together.
+
+    python backtest.py AAPL --strategy rsi --period 10y
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from indicators import ema, rolling_mean_std, rsi
+
+PERIODS_PER_YEAR = 252
+
+# strategy -> (indicator params computed once per group, rule params broadcast over the group, defaults)
+STRATEGIES = {
+    'rsi': (('window',), ('lower', 'upper'), {'window': 20, 'lower': 30, 'upper': 70}),
+    'macd': (('fast', 'slow'), ('signal',), {'fast': 12, 'slow': 26, 'signal': 9}),
+    'bollinger': (('window', 'dev'), ('exit',), {'window': 20, 'dev': 2, 'exit': 'mid'}),
+}
+
+def hold(entries, exits):
+    """Long from each entry bar until the next exit bar (exit wins on a tie); works on (..., n) arrays."""
+    idx = np.arange(entries.shape[-1])
+    last_entry = np.maximum.accumulate(np.where(entries, idx, -1), axis=-1)
+    last_exit = np.maximum.accumulate(np.where(exits, idx, -1), axis=-1)
+    return (last_entry > last_exit).astype(np.float64)
+
+def rsi_positions(close, window=20, lower=30, upper=70, rsi_values=None):
+    """Buy when RSI drops below `lower`, sell when it rises above `upper`.
+
+    lower/upper are scalars or (k,) arrays; the result is always a (k, n) block.
+    """
+    values = rsi(close, window) if rsi_values is None else rsi_values
+    lower, upper = np.atleast_1d(lower).astype(np.float64)[:, None], np.atleast_1d(upper).astype(np.float64)[:, None]
+    return hold(values < lower, values > upper)
+
+def macd_positions(close, fast=12, slow=26, signal=9, macd=None, macd_signal=None):
+    """Long while MACD is above its signal line (i.e. from a bullish crossover to the next bearish one)."""
+    if macd is None:
+        macd = ema(close, fast) - ema(close, slow)
+        macd_signal = ema(macd, signal)
+    return (macd > macd_signal).astype(np.float64)
+
+def bollinger_positions(close, window=20, dev=2, exit='mid', bands=None):
+    """Buy a close below the lower band, sell once the close gets back above the middle (or upper) band."""
+    if bands is None:
+        mid, std = rolling_mean_std(close, window)
+        bands = (mid - dev * std, mid, mid + dev * std)
+    low, mid, high = bands
+    exits = np.stack([close > (mid if e == 'mid' else high) for e in np.atleast_1d(exit)])
+    pos = hold(close < low, exits)
+    return pos if np.ndim(exit) else pos[0]
+
+def evaluate(close, positions, cost_bps=0.0, periods_per_year=PERIODS_PER_YEAR):
+    """Scores positions (n,) or (k, n) against close (n,). A position takes effect on the next bar.
+
+    Returns a dict of (k,) arrays: total_return, annual_return, max_drawdown, sharpe, trades, hit_rate, exposure.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    pos = np.atleast_2d(positions)
+    held = np.concatenate([np.zeros((pos.shape[0], 1)), pos[:, :-1]], axis=1)
+    returns = np.zeros_like(close)
+    returns[1:] = close[1:] / close[:-1] - 1
+    turnover = np.abs(np.diff(held, axis=1, prepend=0.0))
+    strat = held * returns - turnover * cost_bps / 1e4
+    log_equity = np.cumsum(np.log1p(strat), axis=1)
+
+    n = close.shape[-1]
+    total = np.expm1(log_equity[:, -1])
+    peak = np.maximum.accumulate(np.maximum(log_equity, 0.0), axis=1)
+    max_dd = np.expm1((log_equity - peak).min(axis=1))
+    std = strat.std(axis=1)
+    sharpe = np.divide(strat.mean(axis=1), std, out=np.zeros_like(std), where=std > 0) * np.sqrt(periods_per_year)
+
+    # Per-trade returns: label each holding run, then sum its log returns with one bincount
+    starts = (held == 1) & (np.diff(held, axis=1, prepend=0.0) == 1)
+    trade_id = np.cumsum(starts, axis=1) * (held == 1)
+    trades = starts.sum(axis=1)
+    width = int(trades.max()) + 1 if trades.size else 1
+    flat = (trade_id + np.arange(pos.shape[0])[:, None] * width).ravel()
+    per_trade = np.bincount(flat, weights=np.log1p(strat).ravel(), minlength=pos.shape[0] * width).reshape(-1, width)[:, 1:]
+    valid = np.arange(1, width)[None, :] <= trades[:, None]
+    wins = ((per_trade > 0) & valid).sum(axis=1)
+    return {
+        'total_return': total,
+        'annual_return': np.power(1 + total, periods_per_year / max(n - 1, 1)) - 1,
+        'max_drawdown': max_dd,
+        'sharpe': sharpe,
+        'trades': trades,
+        'hit_rate': np.divide(wins, trades, out=np.full(trades.shape, np.nan), where=trades > 0),
+        'exposure': held.mean(axis=1),
+    }
+
+def backtest_frame(df, strategy='rsi', cost_bps=0.0, **rules):
+    """Backtests the indicator columns StockAnalyzer.calculate_indicators already produced (default windows)."""
+    close = df['Close'].to_numpy(dtype=np.float64)
+    params = {**STRATEGIES[strategy][2], **rules}
+    if strategy == 'rsi':
+        pos = rsi_positions(close, lower=params['lower'], upper=params['upper'], rsi_values=df['RSI'].to_numpy(dtype=np.float64))[0]
+    elif strategy == 'macd':
+        pos = macd_positions(close, macd=df['MACD'].to_numpy(dtype=np.float64), macd_signal=df['MACD_Signal'].to_numpy(dtype=np.float64))
+    else:
+        bands = tuple(df[c].to_numpy(dtype=np.float64) for c in ('BB_Low', 'BB_Mid', 'BB_High'))
+        pos = bollinger_positions(close, exit=params['exit'], bands=bands)
+    return {k: v[0].item() for k, v in evaluate(close, pos, cost_bps).items()}
+
+def grid(**params):
+    """Cartesian product of parameter lists as a list of dicts: grid(window=[14, 20], lower=[25, 30])."""
+    names = list(params)
+    return [dict(zip(names, values)) for values in itertools.product(*(np.atleast_1d(params[n]).tolist() for n in names))]
+
+def _score_group(args):
+    """One indicator setting: computes the indicator once and scores every rule combination in the group."""
+    close, strategy, indicator, rule_sets, cost_bps = args
+    if strategy == 'rsi':
+        values = rsi(close, indicator['window'])
+        pos = rsi_positions(close, lower=[r['lower'] for r in rule_sets], upper=[r['upper'] for r in rule_sets], rsi_values=values)
+    elif strategy == 'macd':
+        macd = ema(close, indicator['fast']) - ema(close, indicator['slow'])
+        pos = np.stack([macd_positions(close, macd=macd, macd_signal=ema(macd, r['signal'])) for r in rule_sets])
+    else:
+        pos = bollinger_positions(close, indicator['window'], indicator['dev'], exit=[r['exit'] for r in rule_sets])
+    return evaluate(close, pos, cost_bps)
+
+def sweep(close, strategy, params, cost_bps=5.0, max_workers=None):
+    """Scores every parameter combination (list of dicts from grid()) and returns them ranked by total return.
+
+    Combinations sharing indicator parameters are scored together; groups are spread over a process pool.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    indicator_names, rule_names, defaults = STRATEGIES[strategy]
+    groups = {}
+    for p in params:
+        p = {**defaults, **p}
+        groups.setdefault(tuple(p[n] for n in indicator_names), []).append(p)
+    tasks = [(close, strategy, dict(zip(indicator_names, key)), rule_sets, cost_bps) for key, rule_sets in groups.items()]
+    if max_workers == 1 or len(tasks) == 1:
+        scores = list(map(_score_group, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            scores = list(pool.map(_score_group, tasks, chunksize=max(1, len(tasks) // (4 * (max_workers or os.cpu_count() or 1)))))
+    rows = []
+    for (_, _, _, rule_sets, _), score in zip(tasks, scores):
+        for i, p in enumerate(rule_sets):
+            rows.append({**{n: p[n] for n in indicator_names + rule_names}, **{k: v[i].item() for k, v in score.items()}})
+    return pd.DataFrame(rows).sort_values('total_return', ascending=False, ignore_index=True)
+
+DEFAULT_GRIDS = {
+    'rsi': dict(window=range(5, 31), lower=range(10, 45, 5), upper=range(55, 95, 5)),
+    'macd': dict(fast=range(5, 21), slow=range(20, 61, 5), signal=range(5, 13)),
+    'bollinger': dict(window=range(10, 61, 2), dev=[1.5, 2, 2.5, 3], exit=['mid', 'upper']),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep a signal strategy over a ticker's price history.")
+    parser.add_argument('ticker')
+    parser.add_argument('--strategy', choices=list(STRATEGIES), default='rsi')
+    parser.add_argument('--period', default='10y')
+    parser.add_argument('--cost-bps', type=float, default=5.0)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+    from analyzer import StockAnalyzer
+    df, error = StockAnalyzer().fetch_data(args.ticker, period=args.period)
+    if error: parser.exit(1, f"{error}\n")
+    params = grid(**DEFAULT_GRIDS[args.strategy])
+    if args.strategy == 'macd': params = [p for p in params if p['fast'] < p['slow']]
+    results = sweep(df['Close'].to_numpy(), args.strategy, params, cost_bps=args.cost_bps, max_workers=args.workers)
+    print(f"{len(params)} combinations over {len(df)} bars")
+    print(results.head(args.top).to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+if __name__ == "__main__": main()
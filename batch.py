@@ -0,0 +1,148 @@
+"""Headless report run over a watchlist.
+
+    python batch.py watchlist.txt --out reports.jsonl --parquet reports.parquet --workers 6
+    python batch.py watchlist.txt --out reports.jsonl --no-ai --rate yahoo=1 --rate naver=3:5
+
+The watchlist holds one ticker or company name per line (commas also separate; '#' starts a comment).
+Each finished ticker is appended to the JSONL output and flushed, so the file doubles as the checkpoint:
+rerunning the same command skips tickers that already succeeded and retries the rest.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+import numpy as np
+from analyzer import StockAnalyzer, report_inputs
+from resilience import Upstreams, parse_rates
+
+# requests/second and burst per upstream; Gemini's free tier allows 15 requests/minute
+DEFAULT_RATES = {'yahoo': (2.0, 4.0), 'naver': (5.0, 5.0), 'google': (2.0, 2.0), 'gemini': (0.25, 1.0)}
+
+INDICATOR_FIELDS = ['RSI', 'MACD', 'MACD_Signal', 'BB_High', 'BB_Mid', 'BB_Low']
+
+def read_watchlist(path):
+    symbols = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            symbols += [s.strip() for s in line.split('#')[0].split(',') if s.strip()]
+    return list(dict.fromkeys(symbols))
+
+def read_checkpoint(path):
+    """symbol -> last record in an existing JSONL output; a torn last line from a crash is ignored."""
+    done = {}
+    if not os.path.exists(path): return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            done[record['symbol']] = record
+    return done
+
+def _trim_torn_line(path):
+    """Cuts a crash-torn last line (no trailing newline) so appended records start on a line of their own."""
+    if not os.path.exists(path): return
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+def _value(x):
+    return None if x is None or (isinstance(x, float) and np.isnan(x)) else float(x)
+
+def run_one(analyzer, symbol, api_key=None, period="1y", interval="1d", language='Korean'):
+    start = time.perf_counter()
+    record = {'symbol': symbol, 'status': 'ok', 'generated_at': datetime.now(timezone.utc).isoformat()}
+    try:
+        result = analyzer.analyze(symbol, api_key=api_key, period=period, interval=interval)
+        record.update(ticker=result['ticker'], company_name=result['company_name'], news=result['news'],
+                      stage_errors=result['errors'])
+        df = result['df']
+        if result['error'] or 'RSI' not in df.columns:
+            record.update(status='error', error=result['error'] or "not enough bars for indicators")
+        else:
+            latest = df.iloc[-1]
+            record.update(as_of=df.index[-1].isoformat(), close=_value(latest['Close']), volume=_value(latest['Volume']),
+                          **{k.lower(): _value(latest[k]) for k in INDICATOR_FIELDS})
+            if api_key:
+                # ai_report raises instead of returning an error message, so a failed report isn't checkpointed as done
+                record['report'] = analyzer.ai_report(result['ticker'], *report_inputs(df, result['news']), api_key, language=language)
+    except Exception as e:
+        record.update(status='error', error=str(e))
+    record['elapsed_s'] = round(time.perf_counter() - start, 3)
+    return record
+
+def write_parquet(records, path):
+    import pandas as pd
+    df = pd.DataFrame(records)
+    # Nested fields don't map cleanly onto columns; keep them as JSON text
+    for col in ('news', 'stage_errors'):
+        if col in df.columns: df[col] = df[col].map(lambda v: json.dumps(v, ensure_ascii=False))
+    df.to_parquet(path, index=False)
+
+def run(symbols, out, analyzer, workers=4, api_key=None, period="1y", interval="1d", language='Korean', restart=False, log=print):
+    """Analyzes every symbol not yet done in `out`, appending records as they finish. Returns a summary dict."""
+    if restart and os.path.exists(out): os.remove(out)
+    done = read_checkpoint(out)
+    _trim_torn_line(out)
+    todo = [s for s in symbols if done.get(s, {}).get('status') != 'ok']
+    log(f"{len(symbols)} symbols, {len(symbols) - len(todo)} already done, {len(todo)} to run with {workers} workers")
+
+    start = time.perf_counter()
+    elapsed, failed = [], 0
+    with open(out, 'a', encoding='utf-8') as f, ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as pool:
+        futures = {pool.submit(run_one, analyzer, s, api_key, period, interval, language): s for s in todo}
+        for i, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+            done[record['symbol']] = record
+            elapsed.append(record['elapsed_s'])
+            failed += record['status'] != 'ok'
+            log(f"[{i}/{len(todo)}] {record['symbol']} {record['status']} {record['elapsed_s']:.2f}s" + (f" ({record['error']})" if record.get('error') else ''))
+
+    wall = time.perf_counter() - start
+    return {
+        'symbols': len(symbols), 'ran': len(todo), 'failed': failed, 'wall_s': round(wall, 2),
+        'tickers_per_min': round(len(todo) / wall * 60, 1) if todo and wall > 0 else 0.0,
+        'p50_s': round(float(np.percentile(elapsed, 50)), 2) if elapsed else None,
+        'p95_s': round(float(np.percentile(elapsed, 95)), 2) if elapsed else None,
+        'records': [done[s] for s in symbols if s in done],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the stock analysis (and optional AI report) over a watchlist.")
+    parser.add_argument('watchlist')
+    parser.add_argument('--out', default='reports.jsonl', help="JSONL output; also the resume checkpoint")
+    parser.add_argument('--parquet', help="also write the final records to this Parquet file")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--period', default='1y')
+    parser.add_argument('--interval', default='1d')
+    parser.add_argument('--language', default='Korean')
+    parser.add_argument('--api-key', default=os.environ.get('GEMINI_API_KEY'), help="defaults to $GEMINI_API_KEY")
+    parser.add_argument('--no-ai', action='store_true', help="skip the Gemini report")
+    parser.add_argument('--rate', action='append', metavar='UPSTREAM=RPS[:BURST]',
+                        help=f"override a rate limit; defaults: {', '.join(f'{k}={r:g}' for k, (r, _) in DEFAULT_RATES.items())}")
+    parser.add_argument('--restart', action='store_true', help="ignore the existing output and start over")
+    args = parser.parse_args(argv)
+
+    rates = {**DEFAULT_RATES, **parse_rates(args.rate)}
+    upstreams = Upstreams(rates)
+    analyzer = StockAnalyzer(upstreams=upstreams)
+    summary = run(read_watchlist(args.watchlist), args.out, analyzer, workers=args.workers,
+                  api_key=None if args.no_ai else args.api_key, period=args.period, interval=args.interval,
+                  language=args.language, restart=args.restart, log=lambda msg: print(msg, file=sys.stderr))
+    if args.parquet: write_parquet(summary['records'], args.parquet)
+
+    print(f"ran {summary['ran']} of {summary['symbols']} ({summary['failed']} failed) in {summary['wall_s']}s: "
+          f"{summary['tickers_per_min']} tickers/min, p50 {summary['p50_s']}s, p95 {summary['p95_s']}s per ticker")
+    for name, s in upstreams.stats().items():
+        print(f"  {name:<7} {s['rate']:g}/s  waited {s['waited_s']}s")
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__": sys.exit(main())
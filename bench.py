@@ -0,0 +1,159 @@
+"""Offline benchmark for StockAnalyzer.
+
+Replays fixtures/ (Naver HTML, Google News RSS, yfinance history/info/news, a canned Gemini report)
+through the stand-ins in replay.py, then times each analyzer stage and the end-to-end flow show_home
+runs. No network access is needed.
+
+    python bench.py                      # cold caches, 30 iterations per stage
+    python bench.py --warm --latency-ms 40 --json bench.json
+    python bench.py --record             # refresh fixtures from the live upstreams
+    python bench.py --startup            # cold import cost per module (fresh interpreter each)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+import analyzer
+from replay import API_KEY, _fixture_path, cold_analyzer, replay_upstreams
+
+TICKERS = {'005930.KS': '삼성전자', 'AAPL': 'apple', 'TSLA': 'tesla'}
+
+def stages(ticker, query):
+    """(name, setup(analyzer) -> args, fn(analyzer, *args)) for every benchmarked stage."""
+    def indicators_setup(a):
+        df, _ = a.fetch_data(ticker)
+        return (df,)
+    def report_setup(a):
+        df = a.calculate_indicators(a.fetch_data(ticker)[0])
+        return analyzer.report_inputs(df, a.fetch_news(ticker))
+    def end_to_end(a):
+        result = a.analyze(query, api_key=API_KEY)
+        return a.generate_ai_analysis(result['ticker'], *analyzer.report_inputs(result['df'], result['news']), API_KEY)
+    return [
+        ('get_ticker', lambda a: (), lambda a: a.get_ticker(query)),
+        ('get_company_name', lambda a: (), lambda a: a.get_company_name(ticker)),
+        ('fetch_data', lambda a: (), lambda a: a.fetch_data(ticker)),
+        ('calculate_indicators', indicators_setup, lambda a, df: a.calculate_indicators(df.copy())),
+        ('fetch_news', lambda a: (), lambda a: a.fetch_news(ticker)),
+        ('generate_ai_analysis', report_setup, lambda a, *args: a.generate_ai_analysis(ticker, *args, API_KEY)),
+        ('end_to_end', lambda a: (), end_to_end),
+    ]
+
+def run(iterations=30, latency=0.0, warm=False):
+    results = []
+    with replay_upstreams(latency) as http:
+        shared = cold_analyzer(http)
+        for ticker, query in TICKERS.items():
+            for name, setup, fn in stages(ticker, query):
+                timings = []
+                for _ in range(iterations + 1):
+                    a = shared if warm else cold_analyzer(http)
+                    args = setup(a)
+                    start = time.perf_counter()
+                    fn(a, *args)
+                    timings.append(time.perf_counter() - start)
+                timings = np.array(timings[1:]) * 1e3  # first run warms imports / file cache
+
+                a = shared if warm else cold_analyzer(http)
+                args = setup(a)
+                tracemalloc.start()
+                fn(a, *args)
+                allocated, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                results.append({
+                    'ticker': ticker, 'stage': name, 'iterations': iterations,
+                    'p50_ms': float(np.percentile(timings, 50)), 'p95_ms': float(np.percentile(timings, 95)),
+                    'mean_ms': float(timings.mean()), 'alloc_kib': allocated / 1024, 'peak_kib': peak / 1024,
+                })
+    return results
+
+def record(tickers=TICKERS):
+    """Overwrites the fixtures with live responses (needs network)."""
+    import yfinance as yf
+    from http_client import HttpClient
+    from naver import QUOTE_PAGE_URL, NEWS_PAGE_URL, naver_code
+    http = HttpClient()
+    info, news = {}, {}
+    for ticker in tickers:
+        stock = yf.Ticker(ticker)
+        stock.history(period="1y").to_csv(_fixture_path('yfinance', f"{ticker}.csv"))
+        info[ticker] = {k: v for k, v in stock.info.items() if k in ('shortName', 'longName', 'currency')}
+        news[ticker] = stock.news or []
+        if ticker.endswith(('.KS', '.KQ')):
+            code = naver_code(ticker)
+            for page, url in (('main', QUOTE_PAGE_URL), ('news', NEWS_PAGE_URL)):
+                res = http.get(url.format(code=code), headers={'Referer': f'https://finance.naver.com/item/news.naver?code={code}'})
+                res.encoding = 'euc-kr'
+                with open(_fixture_path('naver', f"{page}_{code}.html"), 'w', encoding='utf-8') as f:
+                    f.write(res.text)
+        else:
+            symbol = ticker.split('.')[0]
+            res = http.get(f"https://news.google.com/rss/search?q={symbol} stock&hl=en-US&gl=US&ceid=US:en", headers={'User-Agent': 'Mozilla/5.0'})
+            with open(_fixture_path('google', f"rss_{symbol}.xml"), 'wb') as f:
+                f.write(res.content)
+    for name, data in (('info.json', info), ('news.json', news)):
+        with open(_fixture_path('yfinance', name), 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+# App modules first, then the heavy third-party imports they defer
+STARTUP_MODULES = ['instrumentation', 'app_deps', 'analyzer', 'gemini', 'naver', 'indicators', 'price_store', 'screener',
+                   'symbols', 'yfinance', 'google.generativeai', 'plotly.graph_objects', 'bs4', 'pytz', 'pandas']
+
+def _importtime(code):
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0: return None
+    # Lines are "import time: self | cumulative | name"; top-level imports have no extra indent
+    rows = [line.split('|') for line in proc.stderr.splitlines() if line.startswith('import time:')]
+    return sum(int(row[1]) for row in rows if row[1].strip().isdigit() and not row[2].startswith('  '))
+
+def import_time(module, repeat=3):
+    """Best-of-`repeat` import time (ms) of `module` in a fresh interpreter, minus interpreter startup."""
+    # What app.py imports before any page runs
+    code = 'import streamlit, os, instrumentation, lazy_import' if module == 'app_deps' else f'import {module}'
+    baseline = min(_importtime('pass') for _ in range(repeat))
+    times = [_importtime(code) for _ in range(repeat)]
+    if None in times: return None
+    return (min(times) - baseline) / 1000
+
+def startup(modules=STARTUP_MODULES, repeat=3):
+    return [{'module': m, 'import_ms': import_time(m, repeat)} for m in modules]
+
+def print_table(results):
+    header = f"{'ticker':<10} {'stage':<22} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9} {'alloc KiB':>10} {'peak KiB':>10}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['ticker']:<10} {r['stage']:<22} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['mean_ms']:>9.3f} {r['alloc_kib']:>10.1f} {r['peak_kib']:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline StockAnalyzer benchmark over recorded fixtures.")
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="simulated latency per upstream call")
+    parser.add_argument('--warm', action='store_true', help="reuse one analyzer so caches stay warm")
+    parser.add_argument('--json', help="also write results to this path")
+    parser.add_argument('--record', action='store_true', help="refresh fixtures from live upstreams and exit")
+    parser.add_argument('--startup', action='store_true', help="measure cold import time per module and exit")
+    args = parser.parse_args()
+    if args.record:
+        record()
+        return
+    if args.startup:
+        results = startup()
+        for r in results:
+            print(f"{r['module']:<24} {'n/a' if r['import_ms'] is None else format(r['import_ms'], '9.1f') + ' ms'}")
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(results, f, indent=2)
+        return
+    results = run(iterations=args.iterations, latency=args.latency_ms / 1000, warm=args.warm)
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__": main()
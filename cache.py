@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL (seconds)."""
+    def __init__(self, maxsize=256, ttl=60, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > self.clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (self.clock() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and entry[0] > self.clock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def items(self):
+        """Snapshot of the unexpired (key, value) pairs, least recently used first."""
+        with self._lock:
+            now = self.clock()
+            return [(key, value) for key, (expires_at, value) in self._data.items() if expires_at > now]
+
+    def stats(self):
+        return {'size': len(self), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+class LookupCache:
+    """TTL/LRU cache for slow upstream lookups: long TTL for hits, short TTL for misses (None)."""
+    def __init__(self, maxsize=4096, ttl=24 * 3600, negative_ttl=300, clock=time.monotonic):
+        self.negative_ttl = negative_ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, clock=clock)
+
+    def get_or_fetch(self, key, fetch):
+        """Returns the cached value for key, calling fetch() on a miss; a None result is cached as negative."""
+        value = self._cache.get(key, _MISSING)
+        if value is not _MISSING: return value
+        value = fetch()
+        self._cache.set(key, value, ttl=self.negative_ttl if value is None else None)
+        return value
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
@@ -0,0 +1,87 @@
+import numpy as np
+from cache import TTLCache
+from lazy_import import LazyModule
+from timeframes import frame_version as data_version
+
+go = LazyModule('plotly.graph_objects')
+
+# Points per trace sent to the browser; ~2 per horizontal pixel of a wide chart
+POINT_BUDGET = 1000
+
+# Built figures keyed by (ticker, data version, labels); a rerun with unchanged data reuses them
+_FIGURES = TTLCache(maxsize=256, ttl=600)
+
+def lttb(x, y, threshold=POINT_BUDGET):
+    """Largest-Triangle-Three-Buckets: indices of ~threshold points that keep the visual shape of (x, y).
+
+    NaNs (indicator warm-up) are dropped first; first and last valid points are always kept.
+    """
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if threshold >= n or threshold < 3: return valid
+    xs, ys = x[valid].astype('float64'), y[valid].astype('float64')
+    # Interior points split into threshold-2 buckets; each picks the point forming the largest triangle
+    # with the previous pick and the average of the next bucket
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = xs[nlo:nhi].mean(), ys[nlo:nhi].mean()
+        area = np.abs((xs[a] - avg_x) * (ys[lo:hi] - ys[a]) - (xs[a] - xs[lo:hi]) * (avg_y - ys[a]))
+        a = lo + int(area.argmax())
+        picked[i + 1] = a
+    return valid[picked]
+
+def epoch_ms(index):
+    """Wall-clock milliseconds for a DatetimeIndex; plotly date axes take these directly (8 bytes vs an ISO string)."""
+    if getattr(index, 'tz', None) is not None: index = index.tz_localize(None)
+    return index.as_unit('ms').asi8.astype('float64')
+
+def _line(x, y, budget, **kwargs):
+    idx = lttb(x, y, budget)
+    # Plotly 6 ships numpy arrays as typed binary; float32 halves the y payload
+    return go.Scattergl(x=x[idx], y=y[idx].astype('float32'), mode='lines', **kwargs)
+
+def _layout(fig, title, height):
+    fig.update_layout(title=title, template="plotly_white", height=height, xaxis=dict(type='date'))
+    return fig
+
+def price_figure(df, t, x=None, budget=POINT_BUDGET):
+    x = epoch_ms(df.index) if x is None else x
+    col = lambda c: df[c].to_numpy(dtype='float64')
+    fig = go.Figure()
+    fig.add_trace(_line(x, col('Close'), budget, name=t['legend_price'], line=dict(color='#2563eb', width=3)))
+    fig.add_trace(_line(x, col('BB_High'), budget, name=t['legend_upper'], line=dict(color='#ef4444', width=1.5)))
+    fig.add_trace(_line(x, col('BB_Low'), budget, name=t['legend_lower'], line=dict(color='#10b981', width=1.5)))
+    fig.add_trace(_line(x, col('BB_Mid'), budget, name=t['legend_mid'], line=dict(color='rgba(0,0,0,0.2)', width=1)))
+    return _layout(fig, t['chart_price_title'], 450)
+
+def rsi_figure(df, t, x=None, budget=POINT_BUDGET):
+    x = epoch_ms(df.index) if x is None else x
+    fig = go.Figure()
+    fig.add_trace(_line(x, df['RSI'].to_numpy(dtype='float64'), budget, name='RSI', line=dict(color='#ef4444')))
+    fig.add_hline(y=70, line_dash="dash", line_color="red")
+    fig.add_hline(y=30, line_dash="dash", line_color="green")
+    return _layout(fig, t['chart_rsi_title'], 300)
+
+def macd_figure(df, t, x=None, budget=POINT_BUDGET):
+    x = epoch_ms(df.index) if x is None else x
+    fig = go.Figure()
+    fig.add_trace(_line(x, df['MACD'].to_numpy(dtype='float64'), budget, name=t['legend_macd'], line=dict(color='#3b82f6', width=2)))
+    fig.add_trace(_line(x, df['MACD_Signal'].to_numpy(dtype='float64'), budget, name=t['legend_signal'], line=dict(color='#f59e0b', width=1.5)))
+    return _layout(fig, t['chart_macd_title'], 300)
+
+def build_figures(df, t, key=None, budget=POINT_BUDGET):
+    """(price+bands, RSI, MACD) figures for an indicator frame, cached per key and data version."""
+    labels = tuple(t[k] for k in ('legend_price', 'legend_upper', 'legend_lower', 'legend_mid', 'legend_macd',
+                                  'legend_signal', 'chart_price_title', 'chart_rsi_title', 'chart_macd_title'))
+    cache_key = None if key is None else (key, data_version(df), labels, budget)
+    figures = None if cache_key is None else _FIGURES.get(cache_key)
+    if figures is None:
+        x = epoch_ms(df.index)
+        figures = (price_figure(df, t, x, budget), rsi_figure(df, t, x, budget), macd_figure(df, t, x, budget))
+        if cache_key is not None: _FIGURES.set(cache_key, figures)
+    return figures
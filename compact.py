@@ -0,0 +1,122 @@
+"""Compact in-memory form of price frames for the in-process caches.
+
+yfinance returns float64 OHLC, int64 volume and two corporate-action columns that are almost always
+zero, on a tz-aware DatetimeIndex; calculate_indicators then adds seven float64 columns. A PackedFrame
+keeps one NumPy array per column instead:
+
+- every float column (prices and indicators) as float32 whenever the float64 values come back exactly
+  (directly, or by rounding to the quote's decimal places), otherwise float64; indicators are in price
+  units and feed the 2-decimal report text and its cache key, so they are never rounded lossily;
+- volume as int64; Dividends / Stock Splits / Capital Gains dropped while they are all zero;
+- the index as int64 epoch nanoseconds plus its timezone.
+
+PackedFrame.to_frame() restores the original column order and dtypes.
+"""
+import numpy as np
+import pandas as pd
+
+# Corporate-action columns dropped when a frame has no events in them (restored as zeros)
+EVENT_COLUMNS = ('Dividends', 'Stock Splits', 'Capital Gains')
+
+# Decimal places tried when checking that a price column survives the float32 round trip
+MAX_DECIMALS = 4
+
+def _float32(values, lossy):
+    """(array, decimals): float32 if the values can be recovered exactly (or the column is listed as lossy)."""
+    packed = values.astype(np.float32)
+    if lossy: return packed, None
+    back = packed.astype(np.float64)
+    if np.array_equal(back, values, equal_nan=True): return packed, None
+    for decimals in range(MAX_DECIMALS + 1):
+        if np.array_equal(np.round(back, decimals), values, equal_nan=True): return packed, decimals
+    return values, None
+
+class PackedFrame:
+    """One array per column plus an epoch-int index; see the module docstring."""
+    __slots__ = ('columns', 'dtypes', 'arrays', 'decimals', 'index', 'index_meta', 'attrs')
+
+    def __init__(self, df, lossy=()):
+        self.columns = list(df.columns)
+        self.dtypes = {c: df[c].dtype for c in self.columns}
+        self.arrays, self.decimals = {}, {}
+        for c in self.columns:
+            values = df[c].to_numpy()
+            if c in EVENT_COLUMNS and not np.any(values): continue
+            if c == 'Volume' and values.dtype.kind == 'f' and np.all(np.isfinite(values)) and np.all(values == np.round(values)):
+                values = values.astype(np.int64)
+            elif values.dtype.kind == 'f':
+                values, decimals = _float32(values.astype(np.float64), c in lossy)
+                if decimals is not None: self.decimals[c] = decimals
+            elif values.dtype.kind in 'iub':
+                values = values.astype(np.int64)
+            self.arrays[c] = values
+        index = df.index
+        if isinstance(index, pd.DatetimeIndex):
+            # asi8 of a tz-aware index is UTC
+            self.index = index.as_unit('ns').asi8
+            self.index_meta = (index.tz, index.unit, index.name, index.freq)
+        else:
+            self.index, self.index_meta = index, None
+        self.attrs = dict(df.attrs)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.arrays.values()) + self.index.nbytes
+
+    @property
+    def frame_nbytes(self):
+        """Approximate size of the same bars as a DataFrame (numeric columns and index only)."""
+        return len(self) * (sum(self.dtypes[c].itemsize for c in self.columns) + 8)
+
+    def to_frame(self):
+        n = len(self)
+        data = {}
+        for c in self.columns:
+            values = self.arrays.get(c)
+            if values is None:
+                data[c] = np.zeros(n, dtype=self.dtypes[c])
+                continue
+            if c in self.decimals:
+                values = np.round(values.astype(np.float64), self.decimals[c])
+            data[c] = values.astype(self.dtypes[c], copy=True)
+        if self.index_meta is None:
+            index = self.index.copy()
+        else:
+            tz, unit, name, freq = self.index_meta
+            index = pd.DatetimeIndex(self.index.view('M8[ns]'), name=name)
+            if tz is not None: index = index.tz_localize('UTC').tz_convert(tz)
+            index = pd.DatetimeIndex(index.as_unit(unit), freq=freq)
+        df = pd.DataFrame(data, index=index, columns=self.columns)
+        df.attrs.update(self.attrs)
+        return df
+
+def pack(df, lossy=()):
+    return None if df is None else PackedFrame(df, lossy=lossy)
+
+def unpack(packed):
+    """DataFrame from a PackedFrame; a DataFrame (or None) is passed through."""
+    return packed.to_frame() if isinstance(packed, PackedFrame) else packed
+
+def memory_report(entries):
+    """Per-ticker memory of cached frames from (ticker, PackedFrame or ndarray) pairs, largest first.
+
+    Columns: frames, rows (bars across frames), packed_bytes, frame_bytes (as DataFrames), ratio.
+    """
+    rows = {}
+    for ticker, value in entries:
+        row = rows.setdefault(ticker, {'frames': 0, 'rows': 0, 'packed_bytes': 0, 'frame_bytes': 0})
+        if isinstance(value, PackedFrame):
+            row['frames'] += 1
+            row['rows'] += len(value)
+            row['packed_bytes'] += value.nbytes
+            row['frame_bytes'] += value.frame_nbytes
+        else:
+            row['packed_bytes'] += value.nbytes
+            row['frame_bytes'] += value.nbytes
+    report = pd.DataFrame.from_dict(rows, orient='index', columns=['frames', 'rows', 'packed_bytes', 'frame_bytes'])
+    report.index.name = 'ticker'
+    report['ratio'] = report['packed_bytes'] / report['frame_bytes'].where(report['frame_bytes'] > 0)
+    return report.sort_values('packed_bytes', ascending=False)
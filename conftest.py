@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from replay import cold_analyzer, replay_upstreams
+
+class Clock:
+    """Manually advanced stand-in for time.monotonic / time.time."""
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+def _random_walk(n, seed=0, start=100.0, drift=0.0, vol=0.015, decimals=None):
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+    return close if decimals is None else np.round(close, decimals)
+
+@pytest.fixture
+def random_walk():
+    """Seeded geometric random-walk closes: random_walk(n, seed=0, start=100.0, drift=0.0, vol=0.015, decimals=None)."""
+    return _random_walk
+
+@pytest.fixture
+def replay_http(request):
+    """Swaps yfinance / google.generativeai for the fixture stand-ins and yields the replay HTTP client.
+
+    Parametrize indirectly to simulate upstream latency (seconds per call).
+    """
+    with replay_upstreams(getattr(request, 'param', 0.0)) as http:
+        yield http
+
+@pytest.fixture
+def make_analyzer(replay_http):
+    """Factory for StockAnalyzers with cold caches and no rate limits over the replayed upstreams."""
+    return lambda **kwargs: cold_analyzer(replay_http, **kwargs)
+
+@pytest.fixture
+def analyzer(make_analyzer):
+    return make_analyzer()
@@ -0,0 +1,180 @@
+import hashlib
+import itertools
+import threading
+import time
+from cache import TTLCache
+from instrumentation import TRACER
+from resilience import CircuitOpenError, Upstreams
+from lazy_import import LazyModule
+
+# google.generativeai pulls in protobuf/grpc (~0.5s); only import it once a key is actually used
+genai = LazyModule('google.generativeai')
+# Not re-exported by the package; models and list_models take a client bound to the configured key
+genai_client = LazyModule('google.generativeai.client')
+
+# Used when list_models fails (e.g. the key lacks the models.list permission)
+FALLBACK_MODELS = ['models/gemini-1.5-flash', 'models/gemini-1.5-pro', 'models/gemini-pro']
+
+# Substrings tried in order; the first available model matching each is preferred, the rest follow
+TICKER_MODEL_TARGETS = ['1.5-flash', 'pro']
+REPORT_MODEL_TARGETS = ['1.5-flash', '1.5-pro', 'gemini-pro', '1.0-pro']
+
+def prioritize(models, targets):
+    ordered = []
+    for target in targets:
+        for m in models:
+            if target in m and m not in ordered:
+                ordered.append(m)
+                break
+    return ordered + [m for m in models if m not in ordered]
+
+def _key_id(api_key):
+    # Cache keys never hold the raw API key
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+class KeyedConfig:
+    """Serializes genai.configure(), which sets process-global state.
+
+    The default clients capture the configured key when they are built, so each request gets its client
+    bound while the gate is held and runs outside it: different keys only wait on configure() itself,
+    never on each other's network calls, and no request goes out under another session's key.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key = None
+
+    def _client(self, api_key, kind):
+        with self._lock:
+            if self._key != api_key:
+                genai.configure(api_key=api_key)
+                self._key = api_key
+            return getattr(genai_client, f'get_default_{kind}_client')()
+
+    def model(self, api_key, model_name):
+        """genai.GenerativeModel with its client bound to api_key."""
+        model = genai.GenerativeModel(model_name)
+        model._client = self._client(api_key, 'generative')
+        return model
+
+    def list_models(self, api_key):
+        return genai.list_models(client=self._client(api_key, 'model'))
+
+# genai has one global configuration, so every selector in the process shares one gate
+GENAI_CONFIG = KeyedConfig()
+
+class ModelSelector:
+    """Per-API-key Gemini model choice: cached list_models, a sticky last-good model and a negative cache of failures."""
+    def __init__(self, models_ttl=3600, preferred_ttl=3600, failure_ttl=300, tracer=None, upstreams=None, config=None,
+                 clock=time.monotonic):
+        self.failure_ttl = failure_ttl
+        self.config = config or GENAI_CONFIG
+        self.tracer = tracer or TRACER
+        self.upstreams = upstreams or Upstreams()
+        self._models = TTLCache(maxsize=256, ttl=models_ttl, clock=clock)
+        self._preferred = TTLCache(maxsize=256, ttl=preferred_ttl, clock=clock)
+        self._failed = TTLCache(maxsize=1024, ttl=failure_ttl, clock=clock)
+
+    def available_models(self, api_key):
+        key = _key_id(api_key)
+        models = self._models.get(key)
+        if models is not None: return models
+        try:
+            with self._guard(api_key), self.tracer.span('gemini.list_models'):
+                models = [m.name for m in self.config.list_models(api_key) if 'generateContent' in m.supported_generation_methods]
+        except Exception:
+            models = []
+        ttl = None
+        if not models:
+            # Retry discovery soon rather than pinning the hardcoded list for the full TTL
+            models, ttl = list(FALLBACK_MODELS), self.failure_ttl
+            self.tracer.event('gemini.fallback_model_list')
+        self._models.set(key, models, ttl=ttl)
+        return models
+
+    def _guard(self, api_key):
+        # Rate limit and circuit per key: one user's exhausted quota must not block everyone else's reports
+        return self.upstreams.guard(f"gemini:{_key_id(api_key)}")
+
+    def preferred(self, api_key):
+        """The model that last succeeded for this key, if any."""
+        return self._preferred.get(_key_id(api_key))
+
+    def candidates(self, api_key, targets=REPORT_MODEL_TARGETS):
+        key = _key_id(api_key)
+        ordered = prioritize(self.available_models(api_key), targets)
+        preferred = self._preferred.get(key)
+        if preferred in ordered:
+            ordered = [preferred] + [m for m in ordered if m != preferred]
+        healthy = [m for m in ordered if (key, m) not in self._failed]
+        # If everything failed recently, try again anyway rather than refusing outright
+        return healthy or ordered
+
+    def mark_success(self, api_key, model_name):
+        key = _key_id(api_key)
+        self._preferred.set(key, model_name)
+        self._failed.pop((key, model_name))
+
+    def mark_failure(self, api_key, model_name):
+        key = _key_id(api_key)
+        # Every failure means the next candidate (if any) is tried
+        self.tracer.event('gemini.model_fallback', model=model_name.split('/')[-1])
+        self._failed.set((key, model_name), True)
+        if self._preferred.get(key) == model_name:
+            self._preferred.pop(key)
+
+    def generate(self, api_key, prompt, targets=REPORT_MODEL_TARGETS):
+        """Runs generate_content on the best candidate, falling back down the list on errors.
+
+        Returns (response, model_name). Raises the last error if every candidate failed.
+        """
+        last_error = RuntimeError("No models found")
+        for model_name in self.candidates(api_key, targets):
+            try:
+                with self._guard(api_key), self.tracer.span('gemini.generate', model=model_name.split('/')[-1]):
+                    response = self.config.model(api_key, model_name).generate_content(prompt)
+                if response and response.text:
+                    self.mark_success(api_key, model_name)
+                    return response, model_name
+                last_error = RuntimeError(f"Empty response from {model_name}")
+            except CircuitOpenError:
+                # Says nothing about the model; the remaining candidates would be refused the same way
+                raise
+            except Exception as e:
+                last_error = e
+            self.mark_failure(api_key, model_name)
+        raise last_error
+
+    def stream(self, api_key, prompt, targets=REPORT_MODEL_TARGETS):
+        """Streams generate_content text chunks from the best candidate.
+
+        Falls back to the next model only while nothing has been yielded yet; an error after the first
+        chunk is raised to the caller. Raises the last error if every candidate failed up front.
+        """
+        last_error = RuntimeError("No models found")
+        for model_name in self.candidates(api_key, targets):
+            started = False
+            try:
+                with self._guard(api_key), self.tracer.span('gemini.stream_open', model=model_name.split('/')[-1]):
+                    chunks = iter(self.config.model(api_key, model_name).generate_content(prompt, stream=True))
+                    # Errors opening the stream surface with the first chunk, so it counts against the circuit
+                    first = list(itertools.islice(chunks, 1))
+                for chunk in itertools.chain(first, chunks):
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Chunks without text parts (e.g. a trailing finish_reason) raise on .text
+                        continue
+                    if text:
+                        started = True
+                        yield text
+                if started:
+                    self.mark_success(api_key, model_name)
+                    return
+                last_error = RuntimeError(f"Empty response from {model_name}")
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if started: raise
+                last_error = e
+            self.mark_failure(api_key, model_name)
+        raise last_error
@@ -0,0 +1,36 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds; every call gets one so a slow upstream can't hang a Streamlit worker
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Keep-alive pool size per upstream host. Unlisted hosts share the default adapter.
+DEFAULT_POOL_SIZES = {
+    'finance.naver.com': 20,
+    'news.google.com': 10,
+}
+
+class HttpClient:
+    """Shared HTTP session with keep-alive pooling, default timeouts and retry/backoff."""
+    def __init__(self, pool_sizes=None, timeout=DEFAULT_TIMEOUT, retries=2, backoff_factor=0.3, default_pool_size=10):
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries, connect=retries, read=retries, status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        default_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=default_pool_size, max_retries=retry)
+        self.session.mount('https://', default_adapter)
+        self.session.mount('http://', default_adapter)
+        for host, size in (DEFAULT_POOL_SIZES if pool_sizes is None else pool_sizes).items():
+            self.session.mount(f"https://{host}/", HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=retry))
+
+    def get(self, url, timeout=None, **kwargs):
+        return self.session.get(url, timeout=timeout or self.timeout, **kwargs)
+
+    def close(self):
+        self.session.close()
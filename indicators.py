@@ -0,0 +1,219 @@
+import math
+from collections import deque
+import numpy as np
+
+# Row order of the block returned by compute_indicators; matches the DataFrame columns the app reads
+INDICATOR_COLUMNS = ('RSI', 'MACD', 'MACD_Signal', 'MACD_Diff', 'BB_High', 'BB_Low', 'BB_Mid')
+RSI, MACD, MACD_SIGNAL, MACD_DIFF, BB_HIGH, BB_LOW, BB_MID = range(len(INDICATOR_COLUMNS))
+
+def ewm_mean(x, alpha, min_periods=0):
+    """pandas `ewm(alpha=alpha, adjust=False).mean()` along the last axis, including its NaN handling."""
+    x = np.asarray(x, dtype=np.float64)
+    rows = x.reshape(-1, x.shape[-1])
+    out = np.empty_like(rows)
+    beta = 1.0 - alpha
+    if rows.shape[0] == 1:
+        # A plain float loop beats per-step numpy calls for a single series
+        weighted, old_wt, nobs = float('nan'), 1.0, 0
+        res = out[0]
+        for i, cur in enumerate(rows[0].tolist()):
+            is_obs = cur == cur
+            nobs += is_obs
+            if weighted == weighted:
+                old_wt *= beta
+                if is_obs:
+                    if weighted != cur:
+                        weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                    old_wt = 1.0
+            elif is_obs:
+                weighted = cur
+            res[i] = weighted if nobs >= min_periods else np.nan
+        return out.reshape(x.shape)
+
+    weighted = rows[:, 0].copy()
+    old_wt = np.ones(rows.shape[0])
+    nobs = (~np.isnan(weighted)).astype(np.int64)
+    out[:, 0] = np.where(nobs >= min_periods, weighted, np.nan)
+    for i in range(1, rows.shape[1]):
+        cur = rows[:, i]
+        is_obs = ~np.isnan(cur)
+        nobs += is_obs
+        started = ~np.isnan(weighted)
+        old_wt = np.where(started, old_wt * beta, old_wt)
+        update = started & is_obs
+        blended = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        weighted = np.where(update, np.where(weighted != cur, blended, weighted), np.where(is_obs, cur, weighted))
+        old_wt = np.where(update, 1.0, old_wt)
+        out[:, i] = np.where(nobs >= min_periods, weighted, np.nan)
+    return out.reshape(x.shape)
+
+def rolling_mean_std(x, window):
+    """Rolling mean and population std (ddof=0) along the last axis via cumulative sums.
+
+    Windows containing a NaN, and the first window-1 positions, are NaN (pandas min_periods=window).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    mean = np.full(x.shape, np.nan)
+    std = np.full(x.shape, np.nan)
+    if x.shape[-1] < window: return mean, std
+    valid = ~np.isnan(x)
+    # Shifting by the series mean keeps the squared sums small and the variance well conditioned
+    count = valid.sum(axis=-1, keepdims=True)
+    shift = np.where(valid, x, 0.0).sum(axis=-1, keepdims=True) / np.maximum(count, 1)
+    centered = np.where(valid, x - shift, 0.0)
+    pad = [(0, 0)] * (x.ndim - 1) + [(1, 0)]
+    c1 = np.pad(np.cumsum(centered, axis=-1), pad)
+    c2 = np.pad(np.cumsum(centered * centered, axis=-1), pad)
+    cn = np.pad(np.cumsum(valid, axis=-1), pad)
+    s1 = c1[..., window:] - c1[..., :-window]
+    s2 = c2[..., window:] - c2[..., :-window]
+    full = (cn[..., window:] - cn[..., :-window]) == window
+    m = s1 / window
+    var = np.maximum(s2 / window - m * m, 0.0)
+    mean[..., window - 1:] = np.where(full, m + shift, np.nan)
+    std[..., window - 1:] = np.where(full, np.sqrt(var), np.nan)
+    return mean, std
+
+def rsi(close, window=20):
+    diff = np.diff(close, axis=-1, prepend=np.nan)
+    with np.errstate(invalid='ignore'):
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+    ema_up = ewm_mean(up, 1.0 / window, window)
+    ema_dn = ewm_mean(down, 1.0 / window, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ema_dn == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_dn))
+
+def ema(x, span):
+    return ewm_mean(x, 2.0 / (span + 1), span)
+
+def compute_indicators(close, rsi_window=20, fast=12, slow=26, signal=9, bb_window=20, bb_dev=2):
+    """Computes RSI, MACD and Bollinger Bands in one pass over `close` (1-D series or 2-D ticker x time).
+
+    Returns a float64 block shaped (len(INDICATOR_COLUMNS),) + close.shape; row i is INDICATOR_COLUMNS[i].
+    Numerically matches ta's RSIIndicator / MACD / BollingerBands with fillna=False.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    block = np.empty((len(INDICATOR_COLUMNS),) + close.shape)
+    block[RSI] = rsi(close, rsi_window)
+    block[MACD] = ema(close, fast) - ema(close, slow)
+    block[MACD_SIGNAL] = ema(block[MACD], signal)
+    block[MACD_DIFF] = block[MACD] - block[MACD_SIGNAL]
+    mid, std = rolling_mean_std(close, bb_window)
+    block[BB_HIGH] = mid + bb_dev * std
+    block[BB_LOW] = mid - bb_dev * std
+    block[BB_MID] = mid
+    return block
+
+class _EwmState:
+    """One step of ewm_mean's recursion, for streaming updates."""
+    __slots__ = ('alpha', 'min_periods', 'weighted', 'old_wt', 'nobs')
+
+    def __init__(self, alpha, min_periods):
+        self.alpha, self.min_periods = alpha, min_periods
+        self.weighted, self.old_wt, self.nobs = float('nan'), 1.0, 0
+
+    def step(self, cur):
+        is_obs = cur == cur
+        self.nobs += is_obs
+        if self.weighted == self.weighted:
+            self.old_wt *= 1.0 - self.alpha
+            if is_obs:
+                if self.weighted != cur:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * cur) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif is_obs:
+            self.weighted = cur
+        return self.weighted if self.nobs >= self.min_periods else float('nan')
+
+    def get(self):
+        return (self.weighted, self.old_wt, self.nobs)
+
+    def set(self, state):
+        self.weighted, self.old_wt, self.nobs = state
+
+class IndicatorState:
+    """Streaming RSI / MACD / Bollinger state that folds in one bar at a time in O(1).
+
+    `push` appends a new bar; `revise` replaces the latest bar (e.g. an intraday live quote) by
+    rolling back to the snapshot taken at the previous close. Both return the indicator values for
+    the latest bar in INDICATOR_COLUMNS order, matching compute_indicators on the full series.
+    """
+    def __init__(self, rsi_window=20, fast=12, slow=26, signal=9, bb_window=20, bb_dev=2):
+        self.bb_window, self.bb_dev = bb_window, bb_dev
+        self._up = _EwmState(1.0 / rsi_window, rsi_window)
+        self._down = _EwmState(1.0 / rsi_window, rsi_window)
+        self._fast = _EwmState(2.0 / (fast + 1), fast)
+        self._slow = _EwmState(2.0 / (slow + 1), slow)
+        self._signal = _EwmState(2.0 / (signal + 1), signal)
+        self._window = deque(maxlen=bb_window)
+        self._last_close = float('nan')
+        self._prev = None
+        self.count = 0
+        self.values = np.full(len(INDICATOR_COLUMNS), np.nan)
+
+    @classmethod
+    def from_closes(cls, closes, **params):
+        state = cls(**params)
+        for close in np.asarray(closes, dtype=np.float64).tolist():
+            state.push(close)
+        return state
+
+    def snapshot(self):
+        return (tuple(e.get() for e in self._ewms()), tuple(self._window), self._last_close, self.count, self.values.copy())
+
+    def restore(self, snap):
+        ewms, window, self._last_close, self.count, values = snap
+        for e, s in zip(self._ewms(), ewms): e.set(s)
+        self._window.clear()
+        self._window.extend(window)
+        self.values = values.copy()
+
+    def copy(self):
+        other = IndicatorState.__new__(IndicatorState)
+        other.__dict__.update(self.__dict__)
+        for name in ('_up', '_down', '_fast', '_slow', '_signal'):
+            src = getattr(self, name)
+            e = _EwmState(src.alpha, src.min_periods)
+            e.set(src.get())
+            setattr(other, name, e)
+        other._window = deque(self._window, maxlen=self._window.maxlen)
+        other.values = self.values.copy()
+        return other
+
+    def push(self, close):
+        self._prev = self.snapshot()
+        return self._apply(float(close))
+
+    def revise(self, close):
+        if self._prev is None: return self.push(close)
+        self.restore(self._prev)
+        return self._apply(float(close))
+
+    def _ewms(self):
+        return (self._up, self._down, self._fast, self._slow, self._signal)
+
+    def _apply(self, close):
+        diff = close - self._last_close
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        ema_up, ema_dn = self._up.step(up), self._down.step(down)
+        if ema_dn == 0: rsi_v = 100.0
+        elif ema_up != ema_up or ema_dn != ema_dn: rsi_v = float('nan')
+        else: rsi_v = 100.0 - 100.0 / (1.0 + ema_up / ema_dn)
+
+        macd_v = self._fast.step(close) - self._slow.step(close)
+        signal_v = self._signal.step(macd_v)
+
+        self._window.append(close)
+        if len(self._window) == self.bb_window and all(v == v for v in self._window):
+            mid = sum(self._window) / self.bb_window
+            std = math.sqrt(sum((v - mid) ** 2 for v in self._window) / self.bb_window)
+            high, low = mid + self.bb_dev * std, mid - self.bb_dev * std
+        else:
+            mid = high = low = float('nan')
+
+        self._last_close = close
+        self.count += 1
+        self.values = np.array([rsi_v, macd_v, signal_v, macd_v - signal_v, high, low, mid])
+        return self.values
@@ -0,0 +1,182 @@
+import contextvars
+import json
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+# Histogram buckets (seconds) for span durations
+SPAN_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+METRIC_PREFIX = 'stockanalyzer'
+
+_current_trace = contextvars.ContextVar('stockanalyzer_trace', default=None)
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _format_labels(pairs):
+    if not pairs: return ''
+    body = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs)
+    return '{' + body + '}'
+
+class Trace:
+    """Spans recorded for one request (e.g. one click on analyze), in start order."""
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.duration = None
+        self.spans = []
+        self.events = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def as_dict(self):
+        return {'name': self.name, 'started_at': self.started_at, 'duration': self.duration,
+                'spans': sorted(self.spans, key=lambda s: s['start']), 'events': dict(self.events)}
+
+class Tracer:
+    """Timing spans around upstream calls and compute stages, plus event counters.
+
+    Aggregates are process-wide (Prometheus text / JSON export); per-request waterfalls are kept for
+    the last `max_traces` traces. Spans opened inside `trace()` attach to that request, including
+    spans in worker threads started with `wrap()`.
+    """
+    def __init__(self, max_traces=50):
+        self._lock = threading.Lock()
+        self._span_counts = Counter()
+        self._span_sums = Counter()
+        self._span_errors = Counter()
+        self._span_buckets = Counter()
+        self._events = Counter()
+        self._gauges = {}
+        self.traces = deque(maxlen=max_traces)
+
+    @contextmanager
+    def trace(self, name):
+        trace = Trace(name)
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            trace.duration = time.perf_counter() - trace._t0
+            _current_trace.reset(token)
+            self.traces.append(trace)
+
+    def current_trace(self):
+        return _current_trace.get()
+
+    def wrap(self, fn):
+        """Binds fn to a copy of the caller's context so spans in a worker thread join the caller's trace."""
+        ctx = contextvars.copy_context()
+        return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+    @contextmanager
+    def span(self, name, **labels):
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, start=start, error=error, **labels)
+
+    def record(self, name, elapsed, start=None, error=None, **labels):
+        """Adds a span measured by the caller, e.g. time to first chunk of a stream that yields across it."""
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._span_counts[key] += 1
+            self._span_sums[key] += elapsed
+            if error is not None: self._span_errors[key] += 1
+            for le in SPAN_BUCKETS:
+                if elapsed <= le: self._span_buckets[key + (le,)] += 1
+        trace = _current_trace.get()
+        if trace is not None:
+            start = time.perf_counter() - elapsed if start is None else start
+            trace.add({'name': name, 'labels': labels, 'start': start - trace._t0, 'duration': elapsed,
+                       'thread': threading.current_thread().name, 'error': None if error is None else repr(error)})
+
+    def event(self, name, **labels):
+        """Counts a decision point, e.g. a fallback taken or the Naver patch applied/skipped."""
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._events[key] += 1
+        trace = _current_trace.get()
+        if trace is not None:
+            with trace._lock:
+                trace.events[name + _format_labels(key[1])] += 1
+
+    def gauge(self, name, value, **labels):
+        """Sets a point-in-time value, e.g. an upstream's circuit state."""
+        with self._lock:
+            self._gauges[(name, _labels_key(labels))] = value
+
+    def snapshot(self):
+        with self._lock:
+            spans = [{'name': name, 'labels': dict(labels), 'count': self._span_counts[(name, labels)],
+                      'sum': self._span_sums[(name, labels)], 'errors': self._span_errors[(name, labels)]}
+                     for name, labels in self._span_counts]
+            events = [{'name': name, 'labels': dict(labels), 'count': count} for (name, labels), count in self._events.items()]
+            gauges = [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in self._gauges.items()]
+        return {'spans': spans, 'events': events, 'gauges': gauges}
+
+    def to_json(self, include_traces=False):
+        data = self.snapshot()
+        if include_traces: data['traces'] = [t.as_dict() for t in list(self.traces)]
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+    def to_prometheus(self):
+        p = METRIC_PREFIX
+        lines = [f"# TYPE {p}_span_seconds histogram"]
+        with self._lock:
+            for (name, labels), count in sorted(self._span_counts.items()):
+                base = (('span', name),) + labels
+                for le in SPAN_BUCKETS:
+                    lines.append(f"{p}_span_seconds_bucket{_format_labels(base + (('le', le),))} {self._span_buckets[(name, labels, le)]}")
+                lines.append(f"{p}_span_seconds_bucket{_format_labels(base + (('le', '+Inf'),))} {count}")
+                lines.append(f"{p}_span_seconds_sum{_format_labels(base)} {self._span_sums[(name, labels)]:.6f}")
+                lines.append(f"{p}_span_seconds_count{_format_labels(base)} {count}")
+            lines.append(f"# TYPE {p}_span_errors_total counter")
+            for (name, labels), count in sorted(self._span_errors.items()):
+                lines.append(f"{p}_span_errors_total{_format_labels((('span', name),) + labels)} {count}")
+            lines.append(f"# TYPE {p}_events_total counter")
+            for (name, labels), count in sorted(self._events.items()):
+                lines.append(f"{p}_events_total{_format_labels((('event', name),) + labels)} {count}")
+            for gauge in sorted({name for name, _ in self._gauges}):
+                lines.append(f"# TYPE {p}_{gauge} gauge")
+                for (name, labels), value in sorted(self._gauges.items()):
+                    if name == gauge: lines.append(f"{p}_{gauge}{_format_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+# Shared by every StockAnalyzer in the process
+TRACER = Tracer()
+
+def start_metrics_server(port, tracer=TRACER, host='0.0.0.0'):
+    """Serves /metrics (Prometheus text) and /metrics.json from a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith('/metrics.json'):
+                body, ctype = tracer.to_json(include_traces='traces' in self.path).encode('utf-8'), 'application/json'
+            elif self.path.startswith('/metrics'):
+                body, ctype = tracer.to_prometheus().encode('utf-8'), 'text/plain; version=0.0.4'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', ctype)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
@@ -0,0 +1,30 @@
+import importlib
+
+class LazyModule:
+    """Stands in for a heavy module until an attribute is first read, then imports it.
+
+    Lets callers keep `yf.Ticker(...)`-style code while module load (and Streamlit pages that never
+    touch the dependency) skip its import cost. importlib serializes concurrent first imports.
+    """
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = self.__dict__['_module'] = importlib.import_module(self._name)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
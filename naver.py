@@ -0,0 +1,72 @@
+import re
+import time
+import lxml.html
+
+QUOTE_PAGE_URL = "https://finance.naver.com/item/main.naver?code={code}"
+NEWS_PAGE_URL = "https://finance.naver.com/item/news_news.naver?code={code}&page=1"
+
+# dl.blind label -> OHLCV column
+OHLCV_LABELS = {'Close': '현재가', 'Open': '시가', 'High': '고가', 'Low': '저가', 'Volume': '거래량'}
+
+# The item/main page is ~100KB but we only need two small fragments; cut them out before parsing
+_DL_BLIND = re.compile(r'<dl\b[^>]*\bclass="[^"]*\bblind\b[^"]*"[^>]*>.*?</dl>', re.S | re.I)
+_WRAP_COMPANY = re.compile(r'<div\b[^>]*\bclass="[^"]*\bwrap_company\b[^"]*"[^>]*>.*?</h2>', re.S | re.I)
+_TD_TITLE = "//td[contains(concat(' ', normalize-space(@class), ' '), ' title ')]//a"
+
+def naver_code(ticker):
+    return ticker.replace('.KS', '').replace('.KQ', '')
+
+def _text(el, sep=''):
+    return sep.join(s.strip() for s in el.itertext() if s.strip())
+
+def extract_quote(html):
+    """(company name, dl.blind text, {label: value}) from an item/main page, parsing only those fragments."""
+    name, blind_text, fields = None, '', {}
+    m = _WRAP_COMPANY.search(html)
+    if m:
+        links = lxml.html.fromstring(m.group(0)).xpath('.//h2//a')
+        if links: name = _text(links[0]) or None
+    m = _DL_BLIND.search(html)
+    if m:
+        dl = lxml.html.fromstring(m.group(0))
+        blind_text = dl.text_content()
+        for dd in dl.iter('dd'):
+            label, _, value = _text(dd, ' ').partition(' ')
+            if label: fields.setdefault(label, value)
+    return name, blind_text, fields
+
+def extract_news_links(html, limit=5):
+    """[{'title', 'link'}] for the first `limit` td.title links of a news_news page."""
+    if not html.strip(): return []
+    items = []
+    for a in lxml.html.fromstring(html).xpath(_TD_TITLE)[:limit]:
+        link = a.get('href')
+        if link is None: continue
+        if not link.startswith('http'): link = f"https://finance.naver.com{link}"
+        items.append({'title': _text(a), 'link': link})
+    return items
+
+class NaverQuotePage:
+    """Parsed snapshot of a Naver Finance item/main page: company name, live OHLCV and the dl.blind fields."""
+    def __init__(self, code, name=None, blind_text='', fields=None, fetched_at=None):
+        self.code = code
+        self.name = name
+        self.blind_text = blind_text
+        self.fields = fields or {}
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    @classmethod
+    def parse(cls, code, html):
+        name, blind_text, fields = extract_quote(html)
+        return cls(code, name=name, blind_text=blind_text, fields=fields)
+
+    def _extract(self, label):
+        m = re.search(rf"{label}\s+([\d,]+)", self.blind_text)
+        return m.group(1).replace(',', '') if m else None
+
+    @property
+    def ohlcv(self):
+        """Live bar as strings ({'Close': '71000', ...}), or None if any field is missing."""
+        if not self.blind_text: return None
+        data = {k: self._extract(v) for k, v in OHLCV_LABELS.items()}
+        return data if all(data.values()) else None
@@ -0,0 +1,133 @@
+import os
+import re
+import threading
+import pandas as pd
+
+DEFAULT_STORE_DIR = os.environ.get('STOCK_PRICE_STORE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'stockanalyzer', 'prices')
+
+# yfinance period -> lookback used to slice stored history and to decide whether the store covers it
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1), '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1), '3mo': pd.DateOffset(months=3), '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1), '2y': pd.DateOffset(years=2), '5y': pd.DateOffset(years=5), '10y': pd.DateOffset(years=10),
+}
+
+# A stored history whose first bar is within this slack of the requested start still counts as covering it
+# (weekends/holidays mean the first trading day is rarely the exact calendar start).
+COVERAGE_SLACK = pd.Timedelta(days=7)
+
+# yfinance corporate-action columns; a new event means Yahoo has re-adjusted every earlier bar
+ACTION_COLUMNS = ('Dividends', 'Stock Splits')
+
+_PERIOD = re.compile(r'^(\d+)(d|mo|y)$')
+
+def period_offset(period):
+    if period in PERIOD_OFFSETS: return PERIOD_OFFSETS[period]
+    # Arbitrary day/month/year counts, e.g. the 60d / 730d limits of intraday intervals
+    m = _PERIOD.match(period)
+    if not m: return None
+    n, unit = int(m.group(1)), m.group(2)
+    return pd.DateOffset(days=n) if unit == 'd' else pd.DateOffset(months=n) if unit == 'mo' else pd.DateOffset(years=n)
+
+def period_start(period, end):
+    """First timestamp a yfinance-style period covers when it ends at `end`; None means unbounded ('max')."""
+    if period == 'ytd':
+        return end.normalize().replace(month=1, day=1)
+    offset = period_offset(period)
+    return None if offset is None else end.normalize() - offset
+
+def longest_period(periods, end):
+    """The period reaching furthest back from `end` ('max' beats everything)."""
+    starts = {p: period_start(p, end) for p in periods}
+    unbounded = [p for p, start in starts.items() if start is None]
+    return unbounded[0] if unbounded else min(starts, key=starts.get)
+
+def new_actions(stored, tail):
+    """True if the tail holds a split or dividend the stored bars don't already reflect."""
+    cols = [c for c in ACTION_COLUMNS if c in tail.columns]
+    events = tail[cols].fillna(0).ne(0).any(axis=1)
+    if not events.any(): return False
+    if not all(c in stored.columns for c in cols): return True
+    known = stored.reindex(tail.index)[cols].fillna(0)
+    return bool((events & tail[cols].fillna(0).ne(known).any(axis=1)).any())
+
+class PriceStore:
+    """Parquet file per ticker holding raw Yahoo history; refreshes only the missing tail on each request."""
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def path(self, ticker, interval='1d'):
+        safe = ticker.replace('/', '_').replace('^', '_')
+        return os.path.join(self.root, f"{safe}_{interval}.parquet")
+
+    def _lock(self, ticker):
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def load(self, ticker, interval='1d'):
+        path = self.path(ticker, interval)
+        if not os.path.exists(path): return None
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            return None
+
+    def save(self, ticker, df, interval='1d'):
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(ticker, interval)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+
+    def _covers(self, stored, period):
+        if period == 'max':
+            return stored.attrs.get('period') == 'max'
+        end = stored.index[-1]
+        start = period_start(period, end)
+        if start is None: return True
+        # Short (intraday) periods get proportionally less slack
+        return stored.index[0] <= start + min(COVERAGE_SLACK, (end - start) / 4)
+
+    def _refetch(self, ticker, fetch, period, interval):
+        df = fetch(period=period, interval=interval)
+        if df is None or df.empty: return df
+        df.attrs['period'] = period
+        self.save(ticker, df, interval)
+        return df.copy()
+
+    def get_history(self, ticker, fetch, period='1y', interval='1d'):
+        """Returns `period` of history, downloading only bars after the last stored one.
+
+        `fetch(**kwargs)` is the upstream download (e.g. yf.Ticker(t).history) and is called either with
+        period=... for a cold/short store or start=... for the incremental tail. If the tail download fails
+        the stored history is served as-is. Yahoo's bars are split/dividend adjusted, so a tail carrying a new
+        corporate action invalidates the stored bars and the whole history is downloaded again.
+        """
+        with self._lock(ticker):
+            stored = self.load(ticker, interval)
+            if stored is None or stored.empty or not self._covers(stored, period):
+                return self._refetch(ticker, fetch, period, interval)
+
+            # Re-fetch the last stored bar too: it may have been saved mid-session
+            try:
+                tail = fetch(start=stored.index[-1].strftime('%Y-%m-%d'), interval=interval)
+            except Exception:
+                tail = None
+            if tail is not None and not tail.empty:
+                tail = tail.tz_convert(stored.index.tz) if stored.index.tz is not None and tail.index.tz is not None else tail
+                if new_actions(stored, tail):
+                    full = longest_period([period, stored.attrs.get('period', period)], stored.index[-1])
+                    df = self._refetch(ticker, fetch, full, interval)
+                    if df is None or df.empty: return df
+                    start = period_start(period, df.index[-1])
+                    return df if start is None else df[df.index >= start]
+                merged = pd.concat([stored[stored.index < tail.index[0]], tail])
+                merged = merged[~merged.index.duplicated(keep='last')]
+                merged.attrs['period'] = stored.attrs.get('period', period)
+                self.save(ticker, merged, interval)
+                stored = merged
+
+            start = period_start(period, stored.index[-1])
+            return (stored if start is None else stored[stored.index >= start]).copy()
@@ -0,0 +1,145 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from naver import naver_code
+
+QUOTE_FIELDS = ('Open', 'High', 'Low', 'Close')
+
+# A polled quote older than this is ignored and the request path scrapes Naver itself
+QUOTE_MAX_AGE = 60
+
+# yfinance fast_info key -> OHLCV field
+FAST_INFO_FIELDS = {'Open': 'open', 'High': 'dayHigh', 'Low': 'dayLow', 'Close': 'lastPrice', 'Volume': 'lastVolume'}
+
+class QuoteTable:
+    """Latest live bar per ticker in preallocated arrays: one row per ticker, written by the poller.
+
+    Reads copy a single row under the lock, so request threads never see a half-written quote.
+    """
+    def __init__(self, capacity=256, clock=time.time):
+        self.clock = clock
+        self._rows = {}
+        self._prices = np.full((capacity, len(QUOTE_FIELDS)), np.nan)
+        self._volume = np.zeros(capacity, dtype=np.int64)
+        self._updated = np.zeros(capacity)
+        self._lock = threading.Lock()
+
+    def _row(self, ticker):
+        row = self._rows.get(ticker)
+        if row is None:
+            row = self._rows[ticker] = len(self._rows)
+            if row >= len(self._volume):
+                grow = len(self._volume)
+                self._prices = np.vstack([self._prices, np.full((grow, len(QUOTE_FIELDS)), np.nan)])
+                self._volume = np.concatenate([self._volume, np.zeros(grow, dtype=np.int64)])
+                self._updated = np.concatenate([self._updated, np.zeros(grow)])
+        return row
+
+    def update(self, ticker, quote, at=None):
+        """Stores an OHLCV mapping (values may be strings, as Naver's are)."""
+        prices = [float(quote[f]) for f in QUOTE_FIELDS]
+        volume = int(float(quote['Volume']))
+        with self._lock:
+            row = self._row(ticker)
+            self._prices[row] = prices
+            self._volume[row] = volume
+            self._updated[row] = self.clock() if at is None else at
+
+    def get(self, ticker, max_age=QUOTE_MAX_AGE):
+        """{'Open', 'High', 'Low', 'Close', 'Volume'} for the ticker, or None if unknown or stale."""
+        with self._lock:
+            row = self._rows.get(ticker)
+            if row is None or (max_age is not None and self.clock() - self._updated[row] > max_age): return None
+            prices, volume = self._prices[row].copy(), int(self._volume[row])
+        return {**dict(zip(QUOTE_FIELDS, prices.tolist())), 'Volume': volume}
+
+    def age(self, ticker):
+        with self._lock:
+            row = self._rows.get(ticker)
+            return None if row is None else self.clock() - self._updated[row]
+
+    def __contains__(self, ticker):
+        with self._lock:
+            return ticker in self._rows
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def snapshot(self):
+        """All quotes as a DataFrame indexed by ticker (with an 'updated_at' epoch column)."""
+        import pandas as pd
+        with self._lock:
+            tickers = sorted(self._rows, key=self._rows.get)
+            n = len(tickers)
+            df = pd.DataFrame(self._prices[:n].copy(), index=tickers, columns=list(QUOTE_FIELDS))
+            df['Volume'] = self._volume[:n].copy()
+            df['updated_at'] = self._updated[:n].copy()
+        return df
+
+class QuotePoller:
+    """Daemon thread that refreshes a watchlist into analyzer.quotes every `interval` seconds (± jitter).
+
+    KR tickers come from the Naver item page, everything else from yfinance fast_info; both go through
+    the analyzer's rate limits and circuit breakers. A failed ticker keeps its last quote until it ages out.
+    """
+    def __init__(self, analyzer, tickers, interval=15, jitter=0.2, max_workers=4):
+        self.analyzer = analyzer
+        self.table = analyzer.quotes
+        self.tickers = list(dict.fromkeys(analyzer.get_ticker(t) for t in tickers))
+        self.interval = interval
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self.cycles = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def fetch(self, ticker):
+        if ticker.endswith(('.KS', '.KQ')):
+            return self.analyzer._download_naver_quote_page(naver_code(ticker)).ohlcv
+        from analyzer import yf
+        with self.analyzer._upstream('yahoo.fast_info'):
+            info = yf.Ticker(ticker).fast_info
+            quote = {field: info[key] for field, key in FAST_INFO_FIELDS.items()}
+        return quote if all(v is not None for v in quote.values()) else None
+
+    def _refresh(self, ticker):
+        try:
+            quote = self.fetch(ticker)
+        except Exception:
+            quote = None
+        if quote is None:
+            self.errors += 1
+            return False
+        self.table.update(ticker, quote)
+        return True
+
+    def poll_once(self, pool=None):
+        if pool is None:
+            return [self._refresh(t) for t in self.tickers]
+        return list(pool.map(self._refresh, self.tickers))
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='quotes') as pool:
+            while not self._stop.is_set():
+                started = time.monotonic()
+                with self.analyzer.tracer.span('quotes.poll'):
+                    self.poll_once(pool)
+                self.cycles += 1
+                # Jitter keeps many workers (or restarts) from hitting Naver in lockstep
+                delay = self.interval * (1 + random.uniform(-self.jitter, self.jitter)) - (time.monotonic() - started)
+                self._stop.wait(max(0.0, delay))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='quote-poller', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(timeout)
@@ -0,0 +1,175 @@
+"""Offline stand-ins for every upstream StockAnalyzer talks to, replaying the recorded fixtures/.
+
+Naver HTML, Google News RSS, yfinance history/info/news and a canned Gemini report are served by local
+replacements for the HTTP client, yfinance and google.generativeai. Used by bench.py and the tests
+(see conftest.py); `python bench.py --record` refreshes the fixtures.
+"""
+import contextlib
+import json
+import os
+import time
+from urllib.parse import urlparse, parse_qs
+import pandas as pd
+import requests
+import analyzer
+import gemini
+from cache import LookupCache
+from resilience import Upstreams
+from singleflight import SingleFlight
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+API_KEY = 'bench-key'
+
+def _fixture_path(*parts):
+    return os.path.join(FIXTURES, *parts)
+
+def _read(*parts):
+    with open(_fixture_path(*parts), encoding='utf-8') as f:
+        return f.read()
+
+def _load_json(*parts):
+    return json.loads(_read(*parts))
+
+class ReplayResponse:
+    def __init__(self, content, encoding='utf-8', status_code=200):
+        self.content = content
+        self.encoding = encoding
+        self.status_code = status_code
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400: raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+class ReplayHttp:
+    """HttpClient stand-in serving fixture files by URL, with optional simulated upstream latency."""
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def get(self, url, timeout=None, **kwargs):
+        if self.latency: time.sleep(self.latency)
+        parsed = urlparse(url)
+        query = parse_qs(parsed.query)
+        if parsed.netloc == 'finance.naver.com':
+            code = query['code'][0]
+            page = 'news' if 'news_news' in parsed.path else 'main'
+            path = _fixture_path('naver', f"{page}_{code}.html")
+            if not os.path.exists(path): return ReplayResponse(b'', status_code=404)
+            # Naver serves EUC-KR
+            return ReplayResponse(_read('naver', f"{page}_{code}.html").encode('euc-kr', errors='replace'), encoding='euc-kr')
+        if parsed.netloc == 'news.google.com':
+            ticker = query['q'][0].split()[0]
+            path = _fixture_path('google', f"rss_{ticker}.xml")
+            return ReplayResponse(open(path, 'rb').read() if os.path.exists(path) else b'<rss/>')
+        return ReplayResponse(b'', status_code=404)
+
+    def close(self):
+        pass
+
+class ReplayTicker:
+    _frames = {}
+
+    def __init__(self, ticker, latency=0.0):
+        self.ticker = ticker
+        self.latency = latency
+
+    def history(self, period="1y", start=None, interval="1d", **kwargs):
+        if self.latency: time.sleep(self.latency)
+        if self.ticker not in self._frames:
+            path = _fixture_path('yfinance', f"{self.ticker}.csv")
+            frame = pd.read_csv(path, index_col=0) if os.path.exists(path) else pd.DataFrame()
+            if not frame.empty:
+                frame.index = pd.to_datetime(frame.index, utc=True).tz_convert('Asia/Seoul' if self.ticker.endswith(('.KS', '.KQ')) else 'America/New_York')
+            self._frames[self.ticker] = frame
+        frame = self._frames[self.ticker]
+        if start is not None and not frame.empty:
+            frame = frame[frame.index >= pd.Timestamp(start, tz=frame.index.tz)]
+        return frame.copy()
+
+    @property
+    def fast_info(self):
+        last = self.history().iloc[-1]
+        return {'open': last['Open'], 'dayHigh': last['High'], 'dayLow': last['Low'], 'lastPrice': last['Close'], 'lastVolume': last['Volume']}
+
+    @property
+    def info(self):
+        if self.latency: time.sleep(self.latency)
+        return _load_json('yfinance', 'info.json').get(self.ticker, {})
+
+    @property
+    def news(self):
+        if self.latency: time.sleep(self.latency)
+        return _load_json('yfinance', 'news.json').get(self.ticker, [])
+
+class ReplayYF:
+    """Just enough of the yfinance module surface for StockAnalyzer."""
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def Ticker(self, ticker):
+        return ReplayTicker(ticker, self.latency)
+
+    def Search(self, name, max_results=5):
+        if self.latency: time.sleep(self.latency)
+        quotes = _load_json('yfinance', 'search.json').get(name.lower(), [])
+        return type('Search', (), {'quotes': quotes[:max_results]})()
+
+    def download(self, tickers, period="1y", **kwargs):
+        frames = {t: self.Ticker(t).history(period=period) for t in tickers}
+        return pd.concat(frames, axis=1).swaplevel(0, 1, axis=1).sort_index(axis=1)
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+class ReplayGenai:
+    """google.generativeai stand-in returning the canned report."""
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def configure(self, api_key=None):
+        pass
+
+    def get_default_generative_client(self):
+        return None
+
+    def get_default_model_client(self):
+        return None
+
+    def list_models(self, client=None):
+        if self.latency: time.sleep(self.latency)
+        model = type('Model', (), {'supported_generation_methods': ['generateContent']})
+        return [type('M', (model,), {'name': n})() for n in ('models/gemini-1.5-flash', 'models/gemini-1.5-pro')]
+
+    def GenerativeModel(self, name):
+        genai = self
+        class Model:
+            def generate_content(self, prompt, stream=False):
+                text = _read('gemini', 'report.md')
+                if not stream:
+                    if genai.latency: time.sleep(genai.latency)
+                    return _Chunk(text)
+                def chunks():
+                    for line in text.splitlines(keepends=True):
+                        if genai.latency: time.sleep(genai.latency / 5)
+                        yield _Chunk(line)
+                return chunks()
+        return Model()
+
+@contextlib.contextmanager
+def replay_upstreams(latency=0.0):
+    """Swaps yfinance and google.generativeai for the fixture stand-ins inside the block."""
+    saved = (analyzer.yf, gemini.genai, gemini.genai_client)
+    analyzer.yf = ReplayYF(latency)
+    gemini.genai = gemini.genai_client = ReplayGenai(latency)
+    try:
+        yield ReplayHttp(latency)
+    finally:
+        analyzer.yf, gemini.genai, gemini.genai_client = saved
+
+def cold_analyzer(http, **kwargs):
+    # No rate limits: the replay has no upstream to protect and limits would dominate the timings
+    return analyzer.StockAnalyzer(http=http, store=False, ticker_lookups=LookupCache(), name_lookups=LookupCache(),
+                                  flights=SingleFlight(), upstreams=Upstreams(rates={}), **kwargs)
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from cache import TTLCache
+
+# Bump when the report prompt changes so old reports stop matching
+REPORT_CACHE_VERSION = 1
+
+def report_key(ticker, price_info, technicals, news, language, avg_purchase_price=None):
+    """Content hash of the normalized inputs that determine an AI report."""
+    norm = lambda s: ' '.join(str(s).split())
+    payload = {
+        'v': REPORT_CACHE_VERSION,
+        'ticker': ticker.strip().upper(),
+        'price': norm(price_info),
+        'technicals': norm(technicals),
+        'news': norm(news),
+        'language': language,
+        'avg_purchase_price': round(float(avg_purchase_price), 2) if avg_purchase_price else None,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+class ReportCache:
+    """TTL + LRU cache of generated AI reports, in-process with an optional SQLite file shared across workers."""
+    def __init__(self, ttl=300, maxsize=512, path=None, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self.maxsize = maxsize
+        self.path = path if path is not None else os.environ.get('STOCK_REPORT_CACHE_DB')
+        self.hits = 0
+        self.misses = 0
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._lock = threading.Lock()
+        if self.path:
+            with self._connect() as db:
+                db.execute("CREATE TABLE IF NOT EXISTS reports (key TEXT PRIMARY KEY, report TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key):
+        report = self._memory.get(key)
+        if report is None and self.path:
+            report = self._disk_get(key)
+            if report is not None: self._memory.set(key, report)
+        with self._lock:
+            if report is None: self.misses += 1
+            else: self.hits += 1
+        return report
+
+    def set(self, key, report):
+        self._memory.set(key, report)
+        if self.path: self._disk_set(key, report)
+
+    def _disk_get(self, key):
+        now = self.clock()
+        try:
+            with self._connect() as db:
+                row = db.execute("SELECT report FROM reports WHERE key = ? AND created > ?", (key, now - self.ttl)).fetchone()
+                if row: db.execute("UPDATE reports SET accessed = ? WHERE key = ?", (now, key))
+                return row[0] if row else None
+        except sqlite3.Error:
+            return None
+
+    def _disk_set(self, key, report):
+        now = self.clock()
+        try:
+            with self._connect() as db:
+                db.execute("INSERT OR REPLACE INTO reports (key, report, created, accessed) VALUES (?, ?, ?, ?)", (key, report, now, now))
+                db.execute("DELETE FROM reports WHERE created <= ?", (now - self.ttl,))
+                db.execute("DELETE FROM reports WHERE key NOT IN (SELECT key FROM reports ORDER BY accessed DESC LIMIT ?)", (self.maxsize,))
+        except sqlite3.Error:
+            pass
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._memory), 'disk': bool(self.path)}
@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from instrumentation import TRACER
+
+# Interactive defaults (requests/second, burst); well under what each upstream tolerates from one host
+DEFAULT_RATES = {'yahoo': (5.0, 10.0), 'naver': (10.0, 20.0), 'google': (5.0, 10.0), 'gemini': (2.0, 5.0)}
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+# Exported as the circuit_state gauge
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`."""
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.clock = clock
+        self.sleep = sleep
+        self.waited = 0.0
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens):
+        """Takes tokens now (possibly going negative) and returns how long the caller must wait."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """Blocks until `tokens` are available; waiters are served in arrival order."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            with self._lock:
+                self.waited += wait
+            self.sleep(wait)
+        return wait
+
+    def try_acquire(self, tokens=1):
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < tokens: return False
+            self._tokens -= tokens
+            return True
+
+def is_upstream_failure(exc):
+    """True if the error says the upstream is down or throttling, not that this one request was bad.
+
+    4xx responses other than 408/429 (bad ticker, bad API key, missing model) leave the circuit alone.
+    """
+    status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    if status is None and isinstance(getattr(exc, 'code', None), int): status = exc.code
+    return not (isinstance(status, int) and 400 <= status < 500 and status not in (408, 429))
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive upstream failures and rejects calls for `reset_timeout`
+    seconds, then lets a single probe through (half-open): success closes it, failure re-opens it.
+    """
+    def __init__(self, name, failure_threshold=5, reset_timeout=30, clock=time.monotonic, on_change=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.on_change = on_change
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_at = None
+        self._lock = threading.Lock()
+
+    def _set(self, state):
+        changed = state != self.state
+        self.state = state
+        if changed and self.on_change is not None: self.on_change(self, state)
+
+    def allow(self):
+        with self._lock:
+            now = self.clock()
+            if self.state == OPEN and now - self._opened_at >= self.reset_timeout:
+                self._set(HALF_OPEN)
+                self._probe_at = None
+            if self.state == CLOSED: return True
+            # One probe at a time; a probe that never reports back is given up on after reset_timeout
+            if self.state == HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.reset_timeout):
+                self._probe_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._set(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+                self._set(OPEN)
+
+def parse_rates(specs):
+    """['yahoo=2', 'naver=5:10'] -> {'yahoo': (2.0, None), 'naver': (5.0, 10.0)} (requests/second[:burst])."""
+    rates = {}
+    for spec in specs or []:
+        name, _, value = spec.partition('=')
+        rate, _, burst = value.partition(':')
+        rates[name.strip()] = (float(rate), float(burst) if burst else None)
+    return rates
+
+class Upstreams:
+    """Per-upstream guards ('yahoo', 'naver', 'google', 'gemini') wrapped around every outbound call.
+
+    Each upstream gets a token bucket (rates={} disables limiting) and a circuit breaker. While a
+    circuit is open, guard() raises CircuitOpenError without waiting, so callers drop straight to their
+    fallback (stored history, Google News RSS, no live patch) instead of waiting out timeouts.
+
+    A scoped name such as 'gemini:<key id>' gets its own bucket (at the 'gemini' rate) and breaker, for
+    upstreams whose quota belongs to the caller rather than to this host.
+    """
+    def __init__(self, rates=None, failure_threshold=5, reset_timeout=30, tracer=None):
+        self.tracer = tracer or TRACER
+        self.rates = dict(DEFAULT_RATES if rates is None else rates)
+        self.limiters = {name: TokenBucket(rate, burst) for name, (rate, burst) in self.rates.items()}
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}
+        self.short_circuits = Counter()
+        self._lock = threading.Lock()
+
+    def breaker(self, name):
+        with self._lock:
+            breaker = self.breakers.get(name)
+            if breaker is None:
+                breaker = self.breakers[name] = CircuitBreaker(name, self.failure_threshold, self.reset_timeout, on_change=self._on_change)
+                self.tracer.gauge('circuit_state', STATE_VALUES[CLOSED], upstream=name)
+            return breaker
+
+    def limiter(self, name):
+        with self._lock:
+            limiter = self.limiters.get(name)
+            base = name.split(':')[0]
+            if limiter is None and base != name and base in self.rates:
+                limiter = self.limiters[name] = TokenBucket(*self.rates[base])
+            return limiter
+
+    def _on_change(self, breaker, state):
+        self.tracer.gauge('circuit_state', STATE_VALUES[state], upstream=breaker.name)
+        self.tracer.event('circuit.transition', upstream=breaker.name, state=state)
+
+    @contextmanager
+    def guard(self, name):
+        breaker = self.breaker(name)
+        if not breaker.allow():
+            self.short_circuits[name] += 1
+            self.tracer.event('circuit.short_circuit', upstream=name)
+            raise CircuitOpenError(f"{name} circuit open after {breaker.failures} consecutive failures")
+        limiter = self.limiter(name)
+        if limiter is not None: limiter.acquire()
+        try:
+            yield
+        except Exception as e:
+            # The upstream answered (e.g. 404 for an unknown ticker), so it counts as healthy
+            if is_upstream_failure(e): breaker.record_failure()
+            else: breaker.record_success()
+            raise
+        breaker.record_success()
+
+    def stats(self):
+        names = sorted(set(self.limiters) | set(self.breakers))
+        stats = {}
+        for name in names:
+            bucket, breaker = self.limiters.get(name), self.breakers.get(name)
+            stats[name] = {
+                'rate': bucket.rate if bucket else None, 'capacity': bucket.capacity if bucket else None,
+                'waited_s': round(bucket.waited, 3) if bucket else 0.0,
+                'state': breaker.state if breaker else CLOSED, 'failures': breaker.failures if breaker else 0,
+                'short_circuits': self.short_circuits[name],
+            }
+        return stats
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from indicators import compute_indicators, RSI, MACD, MACD_SIGNAL, MACD_DIFF, BB_HIGH, BB_LOW
+
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_MAX_WORKERS = 4
+
+RSI_OVERSOLD, RSI_OVERBOUGHT = 30, 70
+# A MACD/signal crossover counts if it happened within this many of the latest bars
+CROSS_LOOKBACK = 3
+
+def download_closes(tickers, download, period="1y", chunk_size=DEFAULT_CHUNK_SIZE, max_workers=DEFAULT_MAX_WORKERS, progress=None):
+    """Downloads close history for many tickers in chunks with bounded concurrency.
+
+    `download(chunk, period)` returns a yf.download-style frame for a list of tickers. Returns
+    ({ticker: close Series with NaNs dropped}, {ticker: error}). `progress(done, total)` is called
+    after each chunk.
+    """
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    closes, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(download, chunk, period): chunk for chunk in chunks}
+        for done, future in enumerate(as_completed(futures), 1):
+            chunk = futures[future]
+            try:
+                data = future.result()
+                frame = data['Close'] if isinstance(data.columns, pd.MultiIndex) else data[['Close']].set_axis(chunk[:1], axis=1)
+                for ticker in chunk:
+                    series = frame[ticker].dropna() if ticker in frame else None
+                    if series is None or series.empty:
+                        errors[ticker] = "No data found"
+                    else:
+                        closes[ticker] = series
+            except Exception as e:
+                for ticker in chunk: errors[ticker] = str(e)
+            if progress: progress(done, len(chunks))
+    return closes, errors
+
+def screen_closes(closes, min_bars=30):
+    """Computes indicators for all tickers at once and returns a ranked signal table.
+
+    Each ticker's own trading days are kept (KR and US calendars differ): series are left-aligned
+    into one ticker x time array, padded with trailing NaN, and read back at each row's last bar.
+    """
+    closes = {t: s for t, s in closes.items() if len(s) >= min_bars}
+    columns = ['ticker', 'close', 'change_pct', 'rsi', 'macd', 'macd_signal', 'macd_cross', 'bb_pct', 'bb_break', 'signals']
+    if not closes: return pd.DataFrame(columns=columns)
+
+    tickers = list(closes)
+    lengths = np.array([len(closes[t]) for t in tickers])
+    panel = np.full((len(tickers), lengths.max()), np.nan)
+    for row, t in enumerate(tickers):
+        panel[row, :lengths[row]] = closes[t].to_numpy(dtype='float64')
+    block = compute_indicators(panel)
+
+    rows = np.arange(len(tickers))
+    last = lengths - 1
+    close, prev_close = panel[rows, last], panel[rows, last - 1]
+    rsi = block[RSI][rows, last]
+    high, low = block[BB_HIGH][rows, last], block[BB_LOW][rows, last]
+
+    # Sign change of MACD - signal within the lookback window
+    recent = np.stack([block[MACD_DIFF][rows, np.maximum(last - k, 0)] for k in range(CROSS_LOOKBACK + 1)])
+    bullish = ((recent[:-1] > 0) & (recent[1:] <= 0)).any(axis=0)
+    bearish = ((recent[:-1] < 0) & (recent[1:] >= 0)).any(axis=0)
+    cross = np.where(bullish, 'bullish', np.where(bearish, 'bearish', ''))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bb_pct = (close - low) / (high - low)
+    bb_break = np.where(close > high, 'upper', np.where(close < low, 'lower', ''))
+    rsi_extreme = (rsi < RSI_OVERSOLD) | (rsi > RSI_OVERBOUGHT)
+
+    table = pd.DataFrame({
+        'ticker': tickers,
+        'close': close,
+        'change_pct': (close / prev_close - 1) * 100,
+        'rsi': rsi,
+        'macd': block[MACD][rows, last],
+        'macd_signal': block[MACD_SIGNAL][rows, last],
+        'macd_cross': cross,
+        'bb_pct': bb_pct,
+        'bb_break': bb_break,
+        'signals': rsi_extreme.astype(int) + (cross != '').astype(int) + (bb_break != '').astype(int),
+    })
+    # Most signals first, then the most extreme RSI
+    table['_rsi_dist'] = (table['rsi'] - 50).abs()
+    return table.sort_values(['signals', '_rsi_dist'], ascending=False).drop(columns='_rsi_dist').reset_index(drop=True)
@@ -0,0 +1,51 @@
+import threading
+from collections import Counter
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one in-flight upstream call.
+
+    Keys are tuples whose first element names the operation; it is used to bucket the metrics.
+    Callers that arrive while a call is in flight wait for it and receive the same result (or
+    exception), so results must be treated as read-only or copied by the caller.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = Counter()
+        self.coalesced = Counter()
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed[key[0]] += 1
+            else:
+                self.coalesced[key[0]] += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None: raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self):
+        with self._lock:
+            return {op: {'executed': self.executed[op], 'coalesced': self.coalesced[op]} for op in set(self.executed) | set(self.coalesced)}
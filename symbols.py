@@ -0,0 +1,199 @@
+import bisect
+import csv
+import difflib
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+
+DEFAULT_SYMBOLS_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'symbols.csv')
+CSV_FIELDS = ['symbol', 'market', 'name_ko', 'name_en', 'aliases']
+
+# Upstream symbol masters used by rebuild_snapshot
+KIND_URL = "https://kind.krx.co.kr/corpgeneral/corpList.do?method=download&searchType=13&marketType={market}"
+KIND_MARKETS = {'stockMkt': ('KOSPI', '.KS'), 'kosdaqMkt': ('KOSDAQ', '.KQ')}
+NASDAQ_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
+OTHER_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt"
+OTHER_EXCHANGES = {'N': 'NYSE', 'A': 'NYSEAMERICAN', 'P': 'NYSEARCA', 'Z': 'BATS', 'V': 'IEX'}
+
+FUZZY_THRESHOLD = 0.8
+MIN_PREFIX_LEN = 2
+
+# The bundled snapshot is a small slice of all listings, so resolve() only answers offline when the match
+# is unambiguous: a prefix must be the only hit and cover this much of the key, a fuzzy best must beat
+# the runner-up by this margin. Anything else goes to the network search.
+PREFIX_COVERAGE = 0.5
+FUZZY_MARGIN = 0.05
+
+_CORP_SUFFIX = re.compile(r"\b(inc|corp|corporation|co|ltd|plc|holdings?|group|company|class [a-z])\b\.?$")
+_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+
+def decompose_hangul(text):
+    """Splits Hangul syllables into conjoining jamo so typos cost one jamo, not a whole syllable."""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(chr(0x1100 + code // 588))
+            out.append(chr(0x1161 + (code % 588) // 28))
+            if code % 28: out.append(chr(0x11A7 + code % 28))
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+def normalize(name):
+    key = name.strip().lower().replace('(주)', '').replace('주식회사', '')
+    key = _CORP_SUFFIX.sub('', key).strip()
+    return _NON_WORD.sub('', key)
+
+class SymbolIndex:
+    """In-memory symbol master: exact, prefix and Hangul-jamo fuzzy lookup of company names to tickers."""
+    def __init__(self, rows):
+        self.symbols = []
+        self.names = []
+        self._exact = {}
+        for row in rows:
+            idx = len(self.symbols)
+            self.symbols.append(row['symbol'])
+            self.names.append(row.get('name_ko') or row.get('name_en') or row['symbol'])
+            base = row['symbol'].split('.')[0]
+            keys = [row['symbol'], base, row.get('name_ko', ''), row.get('name_en', '')] + (row.get('aliases') or '').split('|')
+            for key in filter(None, map(normalize, keys)):
+                # Earlier rows (larger listings in the snapshot) win on collisions
+                self._exact.setdefault(key, idx)
+        self._sorted_keys = sorted(self._exact)
+        self._jamo_keys = [decompose_hangul(k) for k in self._sorted_keys]
+        postings = {}
+        for pos, jamo in enumerate(self._jamo_keys):
+            for gram in set(self._bigrams(jamo)):
+                postings.setdefault(gram, array('I')).append(pos)
+        self._postings = postings
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @staticmethod
+    def _bigrams(text):
+        return [text[i:i + 2] for i in range(len(text) - 1)] or [text]
+
+    def exact(self, query):
+        idx = self._exact.get(normalize(query))
+        return None if idx is None else self.symbols[idx]
+
+    def prefix(self, query, limit=10):
+        key = normalize(query)
+        if len(key) < MIN_PREFIX_LEN: return []
+        start = bisect.bisect_left(self._sorted_keys, key)
+        hits = set()
+        for k in self._sorted_keys[start:]:
+            if not k.startswith(key): break
+            hits.add(self._exact[k])
+        return [self.symbols[i] for i in sorted(hits)[:limit]]
+
+    def fuzzy(self, query, limit=5, threshold=FUZZY_THRESHOLD):
+        """[(symbol, score)] of keys whose jamo spelling is within `threshold` similarity of the query."""
+        jamo = decompose_hangul(normalize(query))
+        if len(jamo) < MIN_PREFIX_LEN: return []
+        counts = Counter()
+        for gram in set(self._bigrams(jamo)):
+            counts.update(self._postings.get(gram, ()))
+        best = {}
+        for pos, _ in counts.most_common(50):
+            score = difflib.SequenceMatcher(None, jamo, self._jamo_keys[pos]).ratio()
+            idx = self._exact[self._sorted_keys[pos]]
+            if score >= threshold and score > best.get(idx, 0):
+                best[idx] = score
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.symbols[i], round(s, 3)) for i, s in ranked[:limit]]
+
+    def resolve(self, query):
+        """Ticker for a company name or symbol, or None unless the match is unambiguous (see PREFIX_COVERAGE)."""
+        symbol = self.exact(query)
+        if symbol: return symbol
+        key = normalize(query)
+        hits = self.prefix(query, limit=2)
+        if len(hits) == 1:
+            keys = [k for k in self._sorted_keys[bisect.bisect_left(self._sorted_keys, key):] if k.startswith(key)]
+            if len(key) >= PREFIX_COVERAGE * min(map(len, keys)): return hits[0]
+        if hits: return None
+        hits = self.fuzzy(query, limit=2)
+        if len(hits) == 1 or (len(hits) == 2 and hits[0][1] - hits[1][1] >= FUZZY_MARGIN): return hits[0][0]
+        return None
+
+    def name(self, symbol):
+        idx = self._exact.get(normalize(symbol))
+        return None if idx is None or self.symbols[idx] != symbol else self.names[idx]
+
+def read_rows(path=DEFAULT_SYMBOLS_CSV):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def load_index(path=DEFAULT_SYMBOLS_CSV):
+    """Builds a SymbolIndex from the bundled CSV snapshot; an empty index if the file is missing."""
+    try:
+        return SymbolIndex(read_rows(path))
+    except OSError:
+        return SymbolIndex([])
+
+_default_index = None
+_default_lock = threading.Lock()
+
+def default_index():
+    """Process-wide index over the bundled snapshot, built on first use."""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = load_index()
+        return _default_index
+
+def _fetch_kind_rows(http):
+    from bs4 import BeautifulSoup
+    rows = []
+    for market_type, (market, suffix) in KIND_MARKETS.items():
+        res = http.get(KIND_URL.format(market=market_type))
+        res.encoding = 'euc-kr'
+        table = BeautifulSoup(res.text, 'html.parser').find('table')
+        header = [th.get_text(strip=True) for th in table.find('tr').find_all(['th', 'td'])]
+        name_col, code_col = header.index('회사명'), header.index('종목코드')
+        for tr in table.find_all('tr')[1:]:
+            cells = [td.get_text(strip=True) for td in tr.find_all('td')]
+            if len(cells) > max(name_col, code_col):
+                rows.append({'symbol': cells[code_col].zfill(6) + suffix, 'market': market, 'name_ko': cells[name_col], 'name_en': '', 'aliases': ''})
+    return rows
+
+def _fetch_us_rows(http):
+    rows = []
+    for url, symbol_col, exchange in ((NASDAQ_LISTED_URL, 'Symbol', None), (OTHER_LISTED_URL, 'ACT Symbol', 'Exchange')):
+        lines = http.get(url).text.strip().splitlines()
+        reader = csv.DictReader(lines[:-1], delimiter='|')  # last line is "File Creation Time"
+        for rec in reader:
+            if rec.get('Test Issue') == 'Y': continue
+            name = rec['Security Name'].split(' - ')[0].strip()
+            market = OTHER_EXCHANGES.get(rec.get(exchange), rec.get(exchange)) if exchange else 'NASDAQ'
+            rows.append({'symbol': rec[symbol_col].replace('.', '-'), 'market': market, 'name_ko': '', 'name_en': name, 'aliases': ''})
+    return rows
+
+def rebuild_snapshot(path=DEFAULT_SYMBOLS_CSV, http=None):
+    """Regenerates the CSV snapshot from KRX KIND and Nasdaq Trader symbol directories.
+
+    Rows already in the snapshot keep their position (so curated large caps stay ranked first) and
+    their curated English/Korean names and aliases; new listings are appended.
+    """
+    if http is None:
+        from http_client import HttpClient
+        http = HttpClient()
+    existing = {row['symbol']: row for row in read_rows(path)} if os.path.exists(path) else {}
+    fetched = {row['symbol']: row for row in _fetch_kind_rows(http) + _fetch_us_rows(http)}
+    merged = [{**fetched.get(sym, {}), **{k: v for k, v in row.items() if v}} for sym, row in existing.items()]
+    merged += [row for sym, row in fetched.items() if sym not in existing]
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows({k: row.get(k, '') for k in CSV_FIELDS} for row in merged)
+    os.replace(tmp, path)
+    return len(merged)
+
+if __name__ == "__main__":
+    print(f"Wrote {rebuild_snapshot()} symbols to {DEFAULT_SYMBOLS_CSV}")
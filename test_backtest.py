@@ -0,0 +1,54 @@
+import numpy as np
+from backtest import backtest_frame, bollinger_positions, evaluate, grid, hold, rsi_positions, sweep
+
+def _naive(close, pos, cost_bps=0.0):
+    equity, peak, max_dd, trades, wins = 1.0, 1.0, 0.0, [], 0
+    prev, trade = 0.0, None
+    for t in range(1, len(close)):
+        held = pos[t - 1]
+        r = held * (close[t] / close[t - 1] - 1) - abs(held - prev) * cost_bps / 1e4
+        if held and not prev: trade = 1.0
+        if held: trade *= 1 + r
+        if prev and not held: trades.append(trade)
+        equity *= 1 + r
+        peak = max(peak, equity)
+        max_dd = min(max_dd, equity / peak - 1)
+        prev = held
+    if prev: trades.append(trade)
+    return equity - 1, max_dd, len(trades), np.mean([x > 1 for x in trades]) if trades else np.nan
+
+def test_hold_keeps_position_between_entry_and_exit():
+    entries = np.array([0, 1, 0, 1, 0, 0, 1, 0], dtype=bool)
+    exits = np.array([0, 0, 0, 0, 1, 0, 1, 0], dtype=bool)
+    assert hold(entries, exits).tolist() == [0, 1, 1, 1, 0, 0, 0, 0]
+
+def test_evaluate_matches_a_bar_by_bar_loop(random_walk):
+    close = random_walk(1500, seed=3, drift=0.0003)
+    positions = np.vstack([rsi_positions(close, 14, [25, 30, 35], [65, 70, 75]), bollinger_positions(close, 20, 2, exit=['mid', 'upper'])])
+    scores = evaluate(close, positions, cost_bps=5)
+    for i, pos in enumerate(positions):
+        total, max_dd, trades, hit = _naive(close, pos, cost_bps=5)
+        assert np.isclose(scores['total_return'][i], total)
+        assert np.isclose(scores['max_drawdown'][i], max_dd)
+        assert scores['trades'][i] == trades
+        assert np.isclose(scores['hit_rate'][i], hit, equal_nan=True)
+
+def test_sweep_matches_single_runs_and_pool(random_walk):
+    close = random_walk(1500, seed=3, drift=0.0003)
+    params = grid(window=[10, 14, 20], lower=[25, 30], upper=[70, 75])
+    serial = sweep(close, 'rsi', params, max_workers=1)
+    pooled = sweep(close, 'rsi', params, max_workers=2)
+    assert len(serial) == 12 and serial.equals(pooled)
+    best = serial.iloc[0]
+    single = evaluate(close, rsi_positions(close, int(best['window']), best['lower'], best['upper']), cost_bps=5)
+    assert np.isclose(single['total_return'][0], best['total_return'])
+    macd = sweep(close, 'macd', [p for p in grid(fast=[8, 12], slow=[26], signal=[9])], max_workers=1)
+    assert len(macd) == 2
+
+def test_backtest_frame_uses_calculated_indicators(analyzer):
+    df = analyzer.calculate_indicators(analyzer.fetch_data('AAPL')[0])
+    close = df['Close'].to_numpy()
+    for strategy in ('rsi', 'macd', 'bollinger'):
+        from_frame = backtest_frame(df, strategy)
+        recomputed = sweep(close, strategy, [{}], cost_bps=0, max_workers=1).iloc[0]
+        assert np.isclose(from_frame['total_return'], recomputed['total_return'])
@@ -0,0 +1,32 @@
+from replay import API_KEY
+from batch import read_checkpoint, read_watchlist, run, write_parquet
+
+def test_batch_resumes_from_jsonl_checkpoint(tmp_path, make_analyzer):
+    watchlist = tmp_path / 'watchlist.txt'
+    watchlist.write_text("005930  # samsung\nAAPL, TSLA\nAAPL\n", encoding='utf-8')
+    symbols = read_watchlist(watchlist)
+    assert symbols == ['005930', 'AAPL', 'TSLA']
+    out = tmp_path / 'out.jsonl'
+    summary = run(symbols, str(out), make_analyzer(), workers=2, api_key=API_KEY, log=lambda m: None)
+    assert summary['ran'] == 3 and summary['failed'] == 0
+    record = read_checkpoint(str(out))['AAPL']
+    assert record['ticker'] == 'AAPL' and record['rsi'] is not None and record['report']
+
+    # Simulate a crash that tore the last line and lost one record
+    lines = out.read_text(encoding='utf-8').splitlines()
+    out.write_text(lines[0] + '\n' + lines[1][:20], encoding='utf-8')
+    summary = run(symbols, str(out), make_analyzer(), workers=2, log=lambda m: None)
+    assert summary['ran'] == 2 and len(summary['records']) == 3
+    assert sorted(read_checkpoint(str(out))) == ['005930', 'AAPL', 'TSLA']
+    write_parquet(summary['records'], str(tmp_path / 'out.parquet'))
+
+def test_failed_report_is_not_checkpointed_as_done(tmp_path, make_analyzer):
+    out = tmp_path / 'out.jsonl'
+    a = make_analyzer()
+    def quota_exceeded(*args, **kwargs): raise RuntimeError('429 quota exceeded')
+    a.models.generate = quota_exceeded
+    summary = run(['AAPL'], str(out), a, workers=1, api_key=API_KEY, log=lambda m: None)
+    record = read_checkpoint(str(out))['AAPL']
+    assert summary['failed'] == 1 and record['status'] == 'error' and 'quota' in record['error'] and 'report' not in record
+    summary = run(['AAPL'], str(out), make_analyzer(), workers=1, api_key=API_KEY, log=lambda m: None)
+    assert summary['ran'] == 1 and read_checkpoint(str(out))['AAPL']['report']
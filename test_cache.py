@@ -0,0 +1,38 @@
+from cache import LookupCache
+
+def _counting(value):
+    calls = []
+    return calls, lambda: calls.append(1) or value
+
+def test_misses_expire_sooner_than_hits(clock):
+    cache = LookupCache(ttl=3600, negative_ttl=60, clock=clock)
+    hit_calls, hit = _counting('AAPL')
+    miss_calls, miss = _counting(None)
+    assert cache.get_or_fetch('apple', hit) == 'AAPL' and cache.get_or_fetch('nothing', miss) is None
+    clock.now += 59
+    cache.get_or_fetch('apple', hit), cache.get_or_fetch('nothing', miss)
+    assert (len(hit_calls), len(miss_calls)) == (1, 1)
+    clock.now += 2
+    cache.get_or_fetch('apple', hit), cache.get_or_fetch('nothing', miss)
+    assert (len(hit_calls), len(miss_calls)) == (1, 2)
+    clock.now += 3600
+    cache.get_or_fetch('apple', hit)
+    assert len(hit_calls) == 2
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = LookupCache(maxsize=2, clock=clock)
+    for key in ('a', 'b'): cache.get_or_fetch(key, lambda: key.upper())
+    cache.get_or_fetch('a', lambda: 'refetched')
+    cache.get_or_fetch('c', lambda: 'C')
+    assert cache.get_or_fetch('a', lambda: 'refetched') == 'A'
+    assert cache.get_or_fetch('b', lambda: 'refetched') == 'refetched'
+    assert cache.stats()['size'] == 2
+
+def test_get_ticker_keeps_keyless_misses_apart_from_ai_answers(analyzer):
+    calls = []
+    analyzer._search_ticker = lambda name, api_key=None: calls.append(api_key) or ('ZZQX' if api_key else None)
+    assert analyzer.get_ticker('zzqx holdings') == 'zzqx holdings'
+    assert analyzer.get_ticker('Zzqx Holdings', api_key='key') == 'ZZQX'
+    assert analyzer.get_ticker('zzqx holdings', api_key='other-key') == 'ZZQX'
+    assert analyzer.get_ticker('zzqx holdings') == 'zzqx holdings'
+    assert calls == [None, 'key']
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from charts import lttb, build_figures, epoch_ms
+from indicators import INDICATOR_COLUMNS, compute_indicators
+
+LABELS = {k: k for k in ('legend_price', 'legend_upper', 'legend_lower', 'legend_mid', 'legend_macd', 'legend_signal',
+                         'chart_price_title', 'chart_rsi_title', 'chart_macd_title')}
+
+def _frame(close):
+    n = len(close)
+    index = pd.date_range('2010-01-04', periods=n, freq='B', tz='Asia/Seoul')
+    df = pd.DataFrame({'Close': close, 'Volume': np.random.default_rng(1).integers(1, 1e6, n)}, index=index)
+    df[list(INDICATOR_COLUMNS)] = compute_indicators(close).T
+    return df
+
+def test_lttb_keeps_endpoints_budget_and_spikes():
+    x = np.arange(10_000, dtype='float64')
+    y = np.sin(x / 500)
+    y[:25] = np.nan
+    y[6000] = 50.0
+    idx = lttb(x, y, 500)
+    assert len(idx) == 500 and idx[0] == 25 and idx[-1] == 9999
+    assert np.all(np.diff(idx) > 0)
+    assert 6000 in idx
+    assert len(lttb(x[25:125], y[25:125], 500)) == 100
+
+def test_epoch_ms_uses_exchange_wall_clock():
+    index = pd.DatetimeIndex(['2024-01-02'], tz='Asia/Seoul')
+    assert epoch_ms(index)[0] == pd.Timestamp('2024-01-02').value // 1_000_000
+
+def test_figures_are_downsampled_and_cached_per_data_version(random_walk):
+    df = _frame(random_walk(5000, seed=1, vol=0.01))
+    fig_p, fig_r, fig_m = build_figures(df, LABELS, key='T')
+    assert all(len(tr.x) <= 1000 and tr.type == 'scattergl' for f in (fig_p, fig_r, fig_m) for tr in f.data)
+    assert fig_p.data[0].y.dtype == np.float32
+    assert build_figures(df, LABELS, key='T')[0] is fig_p
+    df.iloc[-1, df.columns.get_loc('Close')] += 1
+    assert build_figures(df, LABELS, key='T')[0] is not fig_p
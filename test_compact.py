@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from compact import pack, unpack
+
+def _history(close):
+    n = len(close)
+    index = pd.DatetimeIndex(pd.bdate_range('2024-01-01', periods=n, tz='America/New_York'), freq=None, name='Date')
+    return pd.DataFrame({'Open': close - 0.25, 'High': close + 1.5, 'Low': close - 1.25, 'Close': close,
+                         'Volume': np.random.default_rng(5).integers(10**6, 10**9, n), 'Dividends': 0.0, 'Stock Splits': 0.0}, index=index)
+
+def test_round_trip_is_exact_and_smaller(random_walk):
+    df = _history(random_walk(260, seed=5, decimals=2))
+    df.loc[df.index[100], 'Dividends'] = 0.24
+    df.attrs['period'] = '1y'
+    packed = pack(df)
+    assert packed.arrays['Close'].dtype == np.float32 and packed.arrays['Volume'].dtype == np.int64
+    assert 'Stock Splits' not in packed.arrays and 'Dividends' in packed.arrays
+    pd.testing.assert_frame_equal(unpack(packed), df)
+    assert unpack(packed).attrs == {'period': '1y'}
+    assert packed.nbytes < df.memory_usage(index=True).sum() / 2
+
+def test_unrecoverable_prices_stay_float64(random_walk):
+    df = _history(random_walk(260, seed=5, decimals=2))
+    df['Close'] += np.random.default_rng(1).normal(0, 1e-9, len(df))
+    packed = pack(df)
+    assert packed.arrays['Close'].dtype == np.float64
+    pd.testing.assert_frame_equal(unpack(packed), df)
+
+def test_analyzer_caches_packed_bars_and_reports_memory(analyzer):
+    a = analyzer
+    weekly, err = a.fetch_data('AAPL', period='1y', interval='1wk')
+    again, _ = a.fetch_data('AAPL', period='1y', interval='1wk')
+    a.calculate_indicators(again.copy(), ticker=('AAPL', '1y', '1wk'))
+    assert err is None and again.equals(weekly) and again['Close'].dtype == np.float64
+    report = a.memory_report()
+    assert list(report.index) == ['AAPL'] and report.loc['AAPL', 'frames'] == 1
+    assert report.loc['AAPL', 'rows'] == len(weekly) and report.loc['AAPL', 'ratio'] < 1
+
+def test_indicator_columns_round_trip_exactly(analyzer):
+    df = analyzer.analyze_ticker('005930.KS')['df']
+    packed = pack(df)
+    # MACD and the bands are in price units and end up in the 2-decimal report text
+    assert packed.arrays['MACD'].dtype == np.float64
+    pd.testing.assert_frame_equal(unpack(packed), df, check_exact=True)
@@ -0,0 +1,173 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import gemini
+from gemini import ModelSelector, _key_id
+from resilience import CircuitOpenError, Upstreams
+
+FLASH, PRO = 'models/gemini-1.5-flash', 'models/gemini-1.5-pro'
+
+class ResourceExhausted(Exception):
+    code = 429
+
+class FakeGenai:
+    """Stands in for google.generativeai and its client module; records which key each request went out with."""
+    def __init__(self, barrier=None, models=(FLASH,), broken=()):
+        self.key = None
+        self.seen = []
+        self.listed = []
+        self.barrier = barrier
+        self.models, self.broken = models, broken
+
+    def configure(self, api_key=None):
+        self.key = api_key
+
+    def get_default_generative_client(self):
+        # Like the real clients, the key is captured when the client is built
+        return self.key
+
+    def get_default_model_client(self):
+        return self.key
+
+    def list_models(self, client=None):
+        self.listed.append(client)
+        if client == 'unlisted-key': raise PermissionError('models.list denied')
+        model = type('Model', (), {'supported_generation_methods': ['generateContent']})
+        return [type('M', (model,), {'name': n})() for n in self.models]
+
+    def GenerativeModel(self, name):
+        genai = self
+        class Model:
+            _client = None
+            def generate_content(self, prompt, stream=False):
+                key = self._client or genai.key
+                time.sleep(0.005)
+                if genai.barrier: genai.barrier.wait(timeout=1)
+                if key == 'exhausted-key': raise ResourceExhausted('quota exceeded')
+                if name in genai.broken: raise ValueError(f'{name} is unavailable')
+                genai.seen.append((prompt, key))
+                return type('R', (), {'text': f'report for {prompt}'})()
+        return Model()
+
+def _install(monkeypatch, fake):
+    monkeypatch.setattr(gemini, 'genai', fake)
+    monkeypatch.setattr(gemini, 'genai_client', fake)
+    return fake
+
+def test_model_list_is_cached_per_key(monkeypatch):
+    fake = _install(monkeypatch, FakeGenai())
+    models = ModelSelector(upstreams=Upstreams(rates={}))
+    for key in ('key-a', 'key-a', 'key-b', 'key-b'):
+        assert models.available_models(key) == [FLASH]
+    assert fake.listed == ['key-a', 'key-b']
+
+def test_fallback_model_list_is_retried_after_failure_ttl(monkeypatch, clock):
+    fake = _install(monkeypatch, FakeGenai())
+    models = ModelSelector(failure_ttl=300, upstreams=Upstreams(rates={}), clock=clock)
+    assert models.available_models('unlisted-key') == gemini.FALLBACK_MODELS
+    clock.now += 299
+    models.available_models('unlisted-key')
+    assert len(fake.listed) == 1
+    clock.now += 2
+    models.available_models('unlisted-key')
+    assert len(fake.listed) == 2
+
+def test_last_good_model_goes_first_and_failures_sit_out_failure_ttl(monkeypatch, clock):
+    fake = _install(monkeypatch, FakeGenai(models=(FLASH, PRO), broken={FLASH}))
+    models = ModelSelector(failure_ttl=300, upstreams=Upstreams(rates={}), clock=clock)
+    assert models.generate('key', 'a')[1] == PRO
+    fake.broken = ()
+    assert models.candidates('key') == [PRO]
+    assert models.generate('key', 'b')[1] == PRO
+    clock.now += 301
+    # Flash is healthy again but pro stays first until it fails
+    assert models.candidates('key') == [PRO, FLASH]
+    assert [prompt for prompt, _ in fake.seen] == ['a', 'b']
+
+def test_concurrent_keys_never_share_a_configuration(monkeypatch):
+    fake = _install(monkeypatch, FakeGenai())
+    models = ModelSelector(upstreams=Upstreams(rates={}))
+    keys = ['key-a', 'key-b', 'key-c'] * 10
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda k: models.generate(k, k), keys))
+    assert len(fake.seen) == len(keys)
+    assert all(prompt == key for prompt, key in fake.seen)
+
+def test_different_keys_call_concurrently(monkeypatch):
+    # Each call waits at the barrier for the other: a gate held across the call would break it
+    fake = _install(monkeypatch, FakeGenai(barrier=threading.Barrier(2)))
+    models = ModelSelector(upstreams=Upstreams(rates={}))
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(lambda k: models.generate(k, k), ['key-a', 'key-b']))
+    assert sorted(fake.seen) == [('key-a', 'key-a'), ('key-b', 'key-b')]
+
+def test_exhausted_key_only_trips_its_own_circuit(monkeypatch):
+    _install(monkeypatch, FakeGenai())
+    models = ModelSelector(upstreams=Upstreams(rates={}, failure_threshold=2))
+    models.generate('good-key', 'warm')
+    for _ in range(2):
+        with pytest.raises(ResourceExhausted):
+            models.generate('exhausted-key', 'x')
+    with pytest.raises(CircuitOpenError):
+        models.generate('exhausted-key', 'x')
+    assert models.generate('good-key', 'y')[1] == FLASH
+
+    # A refused call says nothing about the model: the preference survives and nothing is negative-cached
+    breaker = models.upstreams.breaker(f"gemini:{_key_id('good-key')}")
+    for _ in range(2): breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        models.generate('good-key', 'z')
+    assert models.preferred('good-key') == FLASH
+    assert (_key_id('good-key'), FLASH) not in models._failed
+
+class StreamingGenai(FakeGenai):
+    """Streams CHUNKS from each model; `broken` models fail before their first chunk, `fail_after` mid-stream."""
+    CHUNKS = ['Buy ', 'and ', 'hold.']
+
+    def __init__(self, broken=(), fail_after=None):
+        super().__init__(models=(FLASH, PRO), broken=broken)
+        self.fail_after = fail_after
+        self.opened = []
+
+    def GenerativeModel(self, name):
+        genai = self
+        class Model:
+            _client = None
+            def generate_content(self, prompt, stream=False):
+                genai.opened.append(name)
+                def chunks():
+                    if name in genai.broken: raise ResourceExhausted('quota exceeded')
+                    for i, text in enumerate(genai.CHUNKS):
+                        if i == genai.fail_after: raise ConnectionError('stream reset')
+                        yield type('C', (), {'text': text})()
+                return chunks()
+        return Model()
+
+def test_stream_falls_back_only_before_the_first_chunk(monkeypatch):
+    fake = _install(monkeypatch, StreamingGenai(broken={FLASH}))
+    models = ModelSelector(upstreams=Upstreams(rates={}))
+    assert ''.join(models.stream('key', 'p')) == 'Buy and hold.'
+    assert fake.opened == [FLASH, PRO]
+    assert models.preferred('key') == PRO
+
+    fake.broken, fake.fail_after, fake.opened = (), 1, []
+    chunks = models.stream('key', 'p')
+    assert next(chunks) == 'Buy '
+    with pytest.raises(ConnectionError):
+        next(chunks)
+    assert fake.opened == [PRO]
+
+def test_stream_ai_analysis_caches_only_complete_reports(analyzer, monkeypatch):
+    fake = _install(monkeypatch, StreamingGenai(fail_after=2))
+    inputs = ('AAPL', 'Price: 1', 'RSI: 50', 'news', 'key')
+    torn = list(analyzer.stream_ai_analysis(*inputs))
+    assert torn[:2] == ['Buy ', 'and '] and 'stream reset' in torn[-1]
+    assert analyzer.reports.stats()['size'] == 0
+
+    fake.fail_after = None
+    assert list(analyzer.stream_ai_analysis(*inputs)) == StreamingGenai.CHUNKS
+    opened = len(fake.opened)
+    # A cache hit yields the whole report at once without calling Gemini
+    assert list(analyzer.stream_ai_analysis(*inputs)) == ['Buy and hold.']
+    assert len(fake.opened) == opened
@@ -0,0 +1,51 @@
+import os
+import numpy as np
+import pandas as pd
+from indicators import INDICATOR_COLUMNS, IndicatorState, compute_indicators
+
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'indicators')
+
+def _reference(name):
+    """Close and the `ta` 0.11 outputs for it (RSI(20), MACD(12, 26, 9), Bollinger(20, 2)), recorded under fixtures/."""
+    return pd.read_csv(os.path.join(REFERENCE, f"{name}.csv"))
+
+def _assert_matches(block, expected):
+    for i, col in enumerate(INDICATOR_COLUMNS):
+        np.testing.assert_allclose(block[i], expected[col].to_numpy(), rtol=1e-7, atol=1e-6, equal_nan=True, err_msg=col)
+
+def test_matches_ta():
+    expected = _reference('random_walk_0')
+    _assert_matches(compute_indicators(expected['Close'].to_numpy()), expected)
+
+def test_matches_ta_with_gaps_and_flat_run():
+    # random_walk_1 with a 25-bar flat run at 100 and missing closes at 50, 51 and 200
+    expected = _reference('gaps_and_flat_run')
+    assert expected['Close'].isna().sum() == 3
+    _assert_matches(compute_indicators(expected['Close'].to_numpy()), expected)
+
+def test_2d_rows_match_1d():
+    expected = [_reference(f"random_walk_{seed}") for seed in range(4)]
+    block = compute_indicators(np.vstack([e['Close'].to_numpy() for e in expected]))
+    for row, e in enumerate(expected):
+        _assert_matches(block[:, row], e)
+
+def test_short_series_is_all_nan_bands(random_walk):
+    block = compute_indicators(random_walk(10, start=70000.0))
+    assert np.isnan(block[INDICATOR_COLUMNS.index('BB_Mid')]).all()
+
+def test_streaming_state_matches_batch(random_walk):
+    close = random_walk(120, start=70000.0)
+    close[[40, 41]] = np.nan
+    state = IndicatorState()
+    for i, c in enumerate(close):
+        values = state.push(c)
+        np.testing.assert_allclose(values, compute_indicators(close[:i + 1])[:, -1], rtol=1e-9, atol=1e-6, equal_nan=True)
+
+def test_revise_rolls_back_to_previous_close(random_walk):
+    close = random_walk(80, start=70000.0)
+    state = IndicatorState.from_closes(close[:-1])
+    state.push(close[-1] * 1.05)
+    state.revise(close[-1] * 0.97)
+    values = state.revise(close[-1])
+    np.testing.assert_allclose(values, compute_indicators(close)[:, -1], rtol=1e-9, atol=1e-6)
+    assert state.count == len(close)
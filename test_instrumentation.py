@@ -0,0 +1,24 @@
+import pytest
+from instrumentation import Tracer
+
+def test_span_records_errors_and_histogram():
+    tracer = Tracer()
+    with tracer.span('work', upstream='x'): pass
+    with pytest.raises(ValueError):
+        with tracer.span('work', upstream='x'): raise ValueError('boom')
+    (span,) = tracer.snapshot()['spans']
+    assert span['count'] == 2 and span['errors'] == 1
+    text = tracer.to_prometheus()
+    assert 'stockanalyzer_span_seconds_count{span="work",upstream="x"} 2' in text
+    assert 'stockanalyzer_span_errors_total{span="work",upstream="x"} 1' in text
+
+def test_analyze_trace_collects_worker_spans_and_fallbacks(analyzer):
+    tracer = Tracer()
+    analyzer.tracer = analyzer.models.tracer = tracer
+    with tracer.trace('req') as trace:
+        result = analyzer.analyze('005930')
+    assert result['df'] is not None
+    names = {s['name'] for s in trace.spans}
+    assert {'stage.history', 'stage.news', 'stage.quote', 'naver.quote_page', 'naver.news', 'stage.indicators'} <= names
+    assert any(k.startswith('naver_patch') for k in trace.events)
+    assert tracer.traces[-1] is trace
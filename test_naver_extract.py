@@ -0,0 +1,51 @@
+import os
+import re
+from bs4 import BeautifulSoup
+from naver import NaverQuotePage, extract_news_links, extract_quote
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'naver')
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+# The previous full-DOM BeautifulSoup scrapers, kept as the parity reference
+def _soup_name(html):
+    tag = BeautifulSoup(html, 'html.parser').select_one('.wrap_company h2 a')
+    return tag.get_text(strip=True) if tag else None
+
+def _soup_price(html):
+    dl = BeautifulSoup(html, 'html.parser').select_one('dl.blind')
+    if not dl: return None
+    text = dl.get_text()
+    def ex(k, t):
+        m = re.search(rf"{k}\s+([\d,]+)", t)
+        return m.group(1).replace(',', '') if m else None
+    data = {k: ex(v, text) for k, v in {'Close': '현재가', 'Open': '시가', 'High': '고가', 'Low': '저가', 'Volume': '거래량'}.items()}
+    return data if all(data.values()) else None
+
+def _soup_news(html):
+    items = []
+    for a in BeautifulSoup(html, 'html.parser').select('td.title a')[:5]:
+        link = a['href']
+        if not link.startswith('http'): link = f"https://finance.naver.com{link}"
+        items.append({'title': a.get_text(strip=True), 'link': link})
+    return items
+
+def test_quote_page_matches_soup():
+    html = _fixture('main_005930.html')
+    page = NaverQuotePage.parse('005930', html)
+    assert page.name == _soup_name(html) == '삼성전자'
+    assert page.ohlcv == _soup_price(html)
+    assert page.ohlcv['Close'] == '150400' and page.ohlcv['Volume'] == '21345678'
+    assert page.fields['전일가'] == '152,500'
+
+def test_news_links_match_soup():
+    html = _fixture('news_005930.html')
+    assert extract_news_links(html) == _soup_news(html)
+    assert extract_news_links(html)[2]['title'] == '반도체 업황 회복 기대감 & 실적 전망 상향'
+
+def test_missing_fragments():
+    assert extract_quote('<html><body>점검 중</body></html>') == (None, '', {})
+    assert NaverQuotePage.parse('005930', '').ohlcv is None
+    assert extract_news_links('') == []
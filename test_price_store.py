@@ -0,0 +1,36 @@
+import pandas as pd
+from price_store import PriceStore
+
+class FakeYahoo:
+    """Serves `bars` like yf.Ticker.history: the whole period, or everything from `start`."""
+    def __init__(self, bars):
+        self.bars = bars
+        self.calls = []
+
+    def __call__(self, period=None, start=None, interval='1d'):
+        self.calls.append('tail' if start else 'full')
+        return self.bars[self.bars.index >= pd.Timestamp(start, tz=self.bars.index.tz)].copy() if start else self.bars.copy()
+
+def _bars(closes, splits=None):
+    index = pd.bdate_range('2024-01-01', periods=len(closes), tz='America/New_York')
+    return pd.DataFrame({'Open': closes, 'High': closes, 'Low': closes, 'Close': closes, 'Volume': 1000,
+                         'Dividends': 0.0, 'Stock Splits': splits or [0.0] * len(closes)}, index=index)
+
+def test_tail_refresh_appends_new_bars(tmp_path):
+    store = PriceStore(str(tmp_path))
+    yahoo = FakeYahoo(_bars([100.0, 101.0]))
+    store.get_history('AAPL', yahoo, period='max')
+    yahoo.bars = _bars([100.0, 101.0, 102.0])
+    df = store.get_history('AAPL', yahoo, period='max')
+    assert df['Close'].tolist() == [100.0, 101.0, 102.0] and yahoo.calls == ['full', 'tail']
+
+def test_split_in_tail_reloads_adjusted_history(tmp_path):
+    store = PriceStore(str(tmp_path))
+    yahoo = FakeYahoo(_bars([100.0, 100.0]))
+    store.get_history('AAPL', yahoo, period='max')
+    # 10:1 split on the third day: Yahoo now serves every earlier bar divided by 10
+    yahoo.bars = _bars([10.0, 10.0, 10.0], splits=[0.0, 0.0, 10.0])
+    df = store.get_history('AAPL', yahoo, period='max')
+    assert df['Close'].tolist() == [10.0, 10.0, 10.0] and yahoo.calls == ['full', 'tail', 'full']
+    again = store.get_history('AAPL', yahoo, period='max')
+    assert again['Close'].tolist() == [10.0, 10.0, 10.0] and yahoo.calls[-1] == 'tail'
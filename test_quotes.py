@@ -0,0 +1,62 @@
+import time
+import numpy as np
+import pandas as pd
+import analyzer as analyzer_module
+from instrumentation import Tracer
+from quotes import QuoteTable, QuotePoller
+
+class FakeClock:
+    def __init__(self): self.now = 1000.0
+    def __call__(self): return self.now
+
+def _freeze(monkeypatch, ts):
+    """Pins the analyzer's "now" (in whatever timezone it asks for)."""
+    monkeypatch.setattr(analyzer_module, 'datetime', type('Clock', (), {'now': staticmethod(lambda tz: pd.Timestamp(ts, tz=tz).to_pydatetime())}))
+
+def test_quote_table_rows_staleness_and_growth():
+    clock = FakeClock()
+    table = QuoteTable(capacity=2, clock=clock)
+    table.update('005930.KS', {'Open': '149000', 'High': '152000', 'Low': '148500', 'Close': '150400', 'Volume': '12345678'})
+    for i in range(5):
+        table.update(f'T{i}', {'Open': i, 'High': i, 'Low': i, 'Close': i, 'Volume': i})
+    assert len(table) == 6
+    assert table.get('005930.KS') == {'Open': 149000.0, 'High': 152000.0, 'Low': 148500.0, 'Close': 150400.0, 'Volume': 12345678}
+    assert table.get('T4')['Close'] == 4.0
+    clock.now += 61
+    assert table.get('005930.KS') is None and table.get('005930.KS', max_age=None) is not None
+    assert list(table.snapshot().index) == ['005930.KS'] + [f'T{i}' for i in range(5)]
+
+def test_polled_quotes_replace_request_time_scrape(analyzer, monkeypatch):
+    _freeze(monkeypatch, '2026-10-19 10:00')  # the session after the fixture's last bar
+    tracer = Tracer()
+    a = analyzer
+    a.tracer = tracer
+    poller = QuotePoller(a, ['005930', 'AAPL'], interval=3600)
+    assert poller.poll_once() == [True, True]
+    poller.interval = 0.01
+    poller.start()
+    deadline = time.monotonic() + 5
+    while poller.cycles < 2 and time.monotonic() < deadline: time.sleep(0.01)
+    poller.stop(timeout=5)
+    assert poller.cycles >= 2 and poller.errors == 0
+    assert a.quotes.get('005930.KS')['Close'] == 150400.0
+    assert np.isclose(a.quotes.get('AAPL')['Close'], a.fetch_data('AAPL')[0]['Close'].iloc[-1])
+    with tracer.trace('req') as trace:
+        result = a.analyze('005930')
+    names = {s['name'] for s in trace.spans}
+    assert 'stage.quote' not in names and 'naver.quote_page' not in names
+    assert trace.events['live_quote{source="table"}'] == 1
+    assert result['df']['Close'].iloc[-1] == 150400.0
+
+def test_previous_session_quote_does_not_append_a_phantom_bar(analyzer, monkeypatch):
+    index = pd.DatetimeIndex([pd.Timestamp('2024-03-07', tz='America/New_York'), pd.Timestamp('2024-03-08', tz='America/New_York')])
+    df = pd.DataFrame({'Open': [10.0, 11.0], 'High': [12.0, 13.0], 'Low': [9.0, 10.5], 'Close': [11.0, 12.5], 'Volume': [100, 200]}, index=index)
+    friday = {'Open': 11.0, 'High': 13.0, 'Low': 10.5, 'Close': 12.5, 'Volume': 250}
+    at = lambda ts: _freeze(monkeypatch, ts)
+    at('2024-03-09 12:00')  # Saturday: fast_info still reports Friday's session
+    assert len(analyzer._apply_naver_patch(df.copy(), friday)) == 2
+    at('2024-03-11 08:00')  # Monday before the open
+    assert len(analyzer._apply_naver_patch(df.copy(), friday)) == 2
+    at('2024-03-11 11:00')
+    patched = analyzer._apply_naver_patch(df.copy(), {**friday, 'Close': 13.0, 'High': 13.5})
+    assert len(patched) == 3 and patched.index[-1] == pd.Timestamp('2024-03-11', tz='America/New_York')
@@ -0,0 +1,48 @@
+import sqlite3
+import report_cache
+from report_cache import ReportCache, report_key
+
+INPUTS = ('AAPL', 'Price: 190.1\nChange: +1.2%', 'RSI: 55.3', '- headline one\n- headline two', 'Korean')
+
+def test_report_key_normalizes_whitespace_and_purchase_price():
+    key = report_key(*INPUTS, avg_purchase_price=150.004)
+    assert report_key(' aapl ', 'Price:  190.1 Change: +1.2%', 'RSI:\t55.3', '- headline one  - headline two', 'Korean',
+                      avg_purchase_price=150.0) == key
+    assert report_key(*INPUTS, avg_purchase_price=150.01) != key
+    assert report_key(*INPUTS) != key
+    assert report_key(*INPUTS[:-1], 'English', avg_purchase_price=150.0) != key
+
+def test_report_key_changes_with_version(monkeypatch):
+    key = report_key(*INPUTS)
+    monkeypatch.setattr(report_cache, 'REPORT_CACHE_VERSION', report_cache.REPORT_CACHE_VERSION + 1)
+    assert report_key(*INPUTS) != key
+
+def test_memory_cache_expires_bounds_and_counts(clock):
+    cache = ReportCache(ttl=60, maxsize=2, path='', clock=clock)
+    cache.set('a', 'report a')
+    cache.set('b', 'report b')
+    assert cache.get('a') == 'report a'
+    cache.set('c', 'report c')
+    # 'b' was least recently used
+    assert cache.get('b') is None and cache.get('a') == 'report a'
+    clock.now += 61
+    assert cache.get('a') is None and cache.get('c') is None
+    assert cache.stats() == {'hits': 2, 'misses': 3, 'size': 0, 'disk': False}
+
+def test_sqlite_reads_through_and_prunes(tmp_path, clock):
+    path = str(tmp_path / 'reports.db')
+    ReportCache(ttl=60, maxsize=2, path=path, clock=clock).set('a', 'report a')
+    # Another worker process: nothing in memory, the report comes from the shared file
+    other = ReportCache(ttl=60, maxsize=2, path=path, clock=clock)
+    assert other.get('a') == 'report a' and other.stats()['hits'] == 1 and other.stats()['size'] == 1
+
+    clock.now += 30
+    other.set('b', 'report b')
+    clock.now += 31
+    other.set('c', 'report c')
+    other.set('d', 'report d')
+    with sqlite3.connect(path) as db:
+        keys = sorted(k for k, in db.execute("SELECT key FROM reports"))
+    # 'a' expired, 'b' fell off the LRU bound
+    assert keys == ['c', 'd']
+    assert ReportCache(ttl=60, path=path, clock=clock).get('a') is None
@@ -0,0 +1,66 @@
+import pytest
+import requests
+from instrumentation import Tracer
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, TokenBucket, Upstreams, parse_rates
+
+class FakeClock:
+    def __init__(self): self.now = 0.0
+    def __call__(self): return self.now
+    def sleep(self, s): self.now += s
+
+def test_token_bucket_spaces_calls_after_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+    waits = [bucket.acquire() for _ in range(5)]
+    assert waits[:2] == [0, 0] and waits[2:] == [0.5, 0.5, 0.5]
+    assert parse_rates(['yahoo=2', 'naver=5:10']) == {'yahoo': (2.0, None), 'naver': (5.0, 10.0)}
+    upstreams = Upstreams(rates={'gemini': (0.5, 1.0)})
+    a, b = upstreams.limiter('gemini:a'), upstreams.limiter('gemini:b')
+    assert a is not b and a.rate == 0.5 and upstreams.limiter('yahoo') is None
+
+def test_breaker_opens_probes_and_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker('naver', failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+    clock.now = 30
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # one probe at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+    clock.now = 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+def test_client_errors_do_not_trip_the_circuit():
+    tracer = Tracer()
+    upstreams = Upstreams(rates={}, failure_threshold=2, tracer=tracer)
+    not_found = requests.HTTPError(response=type('R', (), {'status_code': 404})())
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError):
+            with upstreams.guard('naver'): raise not_found
+    assert upstreams.breakers['naver'].state == CLOSED
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            with upstreams.guard('naver'): raise ConnectionError('reset')
+    with pytest.raises(CircuitOpenError):
+        with upstreams.guard('naver'): pass
+    assert 'stockanalyzer_circuit_state{upstream="naver"} 2' in tracer.to_prometheus()
+    assert upstreams.stats()['naver']['short_circuits'] == 1
+
+def test_open_circuits_fall_back_without_calling_upstream(analyzer):
+    tracer = Tracer()
+    a = analyzer
+    a.tracer = tracer
+    for name in ('naver', 'yahoo'):
+        breaker = a.upstreams.breaker(name)
+        for _ in range(breaker.failure_threshold): breaker.record_failure()
+    with tracer.trace('req') as trace:
+        assert a._fetch_naver_price('005930.KS') is None
+        a.fetch_news('AAPL')
+    # Yahoo news is skipped and Google News RSS is asked instead
+    assert {s['name'] for s in trace.spans} == {'google.news_rss'}
+    assert a.upstreams.short_circuits['naver'] == 1 and a.upstreams.short_circuits['yahoo'] == 1
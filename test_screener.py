@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+from indicators import compute_indicators, RSI
+from screener import screen_closes
+
+def test_uneven_histories_match_single_ticker_math(random_walk):
+    closes = {t: pd.Series(random_walk(n, seed=seed, vol=0.02)) for t, n, seed in (('A', 250, 0), ('B', 120, 1), ('C', 20, 2))}
+    table = screen_closes(closes).set_index('ticker')
+    assert 'C' not in table.index
+    for t in ('A', 'B'):
+        block = compute_indicators(closes[t].to_numpy())
+        assert np.isclose(table.loc[t, 'rsi'], block[RSI][-1])
+        assert table.loc[t, 'close'] == closes[t].iloc[-1]
+
+def test_breakout_ranks_first(random_walk):
+    flat = pd.Series(np.r_[np.full(60, 100.0) + np.sin(np.arange(60)), 130.0])
+    table = screen_closes({'FLAT': pd.Series(random_walk(61, seed=3, vol=0.02)), 'BREAK': flat})
+    assert table.iloc[0]['ticker'] == 'BREAK'
+    assert table.iloc[0]['bb_break'] == 'upper'
@@ -0,0 +1,77 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import analyzer as analyzer_module
+from analyzer import ReportError
+
+@pytest.mark.parametrize('replay_http', [0.005], indirect=True)
+def test_shared_analyzer_serves_concurrent_sessions(analyzer):
+    a = analyzer
+    expected = {q: a.analyze(q) for q in ('005930', 'AAPL', 'TSLA')}
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda q: (q, a.analyze(q)), list(expected) * 8))
+    for q, result in results:
+        assert result['errors'] == {}
+        assert result['ticker'] == expected[q]['ticker']
+        assert result['news'] == expected[q]['news']
+        assert result['df'][['Close', 'RSI', 'MACD']].iloc[:-1].equals(expected[q]['df'][['Close', 'RSI', 'MACD']].iloc[:-1])
+
+def test_news_cache_skips_refetch_and_hands_out_copies(analyzer):
+    first = analyzer.fetch_news('AAPL')
+    first[0]['title'] = 'mutated'
+    assert analyzer.fetch_news('AAPL')[0]['title'] != 'mutated'
+    assert analyzer.flights.executed['news'] == 1
+
+@pytest.mark.parametrize('replay_http', [0.1], indirect=True)
+def test_queued_stages_do_not_time_out(make_analyzer):
+    # 18 requests fan out their stages onto 2 workers: many wait in the queue far longer than their timeout
+    a = make_analyzer(max_workers=2)
+    timeouts = dict.fromkeys(('name', 'history', 'quote', 'news'), 0.6)
+    with ThreadPoolExecutor(max_workers=18) as pool:
+        results = list(pool.map(lambda t: a.analyze_ticker(t, timeouts=timeouts), ['005930.KS', 'AAPL', 'TSLA'] * 6))
+    assert [r['errors'] for r in results] == [{}] * 18
+    assert all(r['df'] is not None for r in results)
+
+def test_saturated_pool_waits_one_queue_budget_per_request(make_analyzer, monkeypatch):
+    monkeypatch.setattr(analyzer_module, 'STAGE_QUEUE_TIMEOUT', 0.2)
+    a = make_analyzer(max_workers=1)
+    release = threading.Event()
+    a._executor.submit(release.wait, 5)
+    try:
+        begin = time.monotonic()
+        result = a.analyze_ticker('AAPL')
+        elapsed = time.monotonic() - begin
+    finally:
+        release.set()
+    assert 'history' in result['errors'] and all('no worker free' in e for e in result['errors'].values())
+    assert elapsed < 0.5
+
+@pytest.mark.parametrize('replay_http', [0.02], indirect=True)
+def test_name_and_quote_stages_share_one_naver_page_fetch(analyzer, replay_http):
+    urls, get = [], replay_http.get
+    replay_http.get = lambda url, **kwargs: urls.append(url) or get(url, **kwargs)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: analyzer.analyze_ticker('005930.KS'), range(8)))
+    assert all(r['errors'] == {} and r['company_name'] == '삼성전자' for r in results)
+    assert sum('item/main' in u for u in urls) == 1
+
+def test_concurrent_reports_with_different_keys_do_not_share_a_call(analyzer):
+    calls, leader_started = [], threading.Event()
+    def generate(api_key, prompt, targets=None):
+        calls.append(api_key)
+        if api_key == 'bad':
+            leader_started.set()
+            time.sleep(0.1)
+            raise RuntimeError('400 API key not valid')
+        return type('R', (), {'text': 'report'})(), 'models/gemini-1.5-flash'
+    analyzer.models.generate = generate
+    inputs = ('AAPL', 'Price: 1', 'RSI: 50', 'news')
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        bad = pool.submit(analyzer.ai_report, *inputs, 'bad')
+        leader_started.wait(1)
+        good = pool.submit(analyzer.ai_report, *inputs, 'good')
+        assert good.result() == 'report'
+        with pytest.raises(ReportError):
+            bad.result()
+    assert sorted(calls) == ['bad', 'good']
@@ -0,0 +1,29 @@
+from symbols import SymbolIndex, decompose_hangul, load_index
+
+def test_bundled_snapshot_resolves_common_queries():
+    index = load_index()
+    assert index.resolve('삼성전자') == '005930.KS'
+    assert index.resolve('apple') == 'AAPL'
+    assert index.resolve('Microsoft Corporation') == 'MSFT'
+    assert index.resolve('테슬라') == 'TSLA'
+
+def test_prefix_prefers_earlier_rows():
+    index = SymbolIndex([
+        {'symbol': '005930.KS', 'name_ko': '삼성전자', 'name_en': 'Samsung Electronics'},
+        {'symbol': '009150.KS', 'name_ko': '삼성전기', 'name_en': 'Samsung Electro-Mechanics'},
+    ])
+    assert index.prefix('삼성') == ['005930.KS', '009150.KS']
+    assert index.resolve('삼성전') is None
+    assert index.resolve('삼성전자') == '005930.KS'
+
+def test_partial_queries_resolve_offline_only_when_unambiguous():
+    index = load_index()
+    # Several (or, in a small snapshot, possibly unlisted) companies match: left to the network search
+    assert index.resolve('한화') is None and index.resolve('micro') is None and index.resolve('ap') is None
+    assert index.resolve('마이크로소프') == 'MSFT' and index.resolve('nvida') == 'NVDA'
+
+def test_fuzzy_tolerates_single_jamo_typo():
+    assert decompose_hangul('자') != decompose_hangul('사')
+    index = load_index()
+    assert index.resolve('삼성전사') == '005930.KS'
+    assert index.resolve('xyzzy') is None
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from timeframes import clamp_period, plan, resample_ohlcv
+
+def _bars(index, close):
+    return pd.DataFrame({'Open': close - 0.5, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': np.random.default_rng(2).integers(1, 1000, len(index))}, index=index)
+
+def test_plan_derives_coarse_bars_within_yahoo_limits():
+    assert plan('5y', '1wk') == ('1d', 'W-MON')
+    assert plan('max', '1mo') == ('1d', 'MS')
+    assert plan('60d', '60m') == ('5m', '60min')
+    assert plan('730d', '60m') == ('60m', None)
+    assert plan('1y', '1d') == ('1d', None)
+    assert clamp_period('1y', '5m') == '60d' and clamp_period('5d', '5m') == '5d' and clamp_period('max', '1d') == 'max'
+
+def test_weekly_resample_matches_manual_aggregation(random_walk):
+    index = pd.bdate_range('2024-01-01', '2024-03-29', tz='America/New_York')
+    daily = _bars(index, random_walk(len(index), seed=2))
+    weekly = resample_ohlcv(daily, 'W-MON')
+    week = daily.loc['2024-01-08':'2024-01-12']
+    row = weekly.loc[pd.Timestamp('2024-01-08', tz='America/New_York')]
+    assert row['Open'] == week['Open'].iloc[0] and row['Close'] == week['Close'].iloc[-1]
+    assert row['High'] == week['High'].max() and row['Low'] == week['Low'].min() and row['Volume'] == week['Volume'].sum()
+
+def test_hourly_bins_start_at_session_open(random_walk):
+    days = [pd.date_range(f'2024-03-0{d} 09:30', f'2024-03-0{d} 15:55', freq='5min', tz='America/New_York') for d in (4, 5)]
+    index = days[0].append(days[1])
+    hourly = resample_ohlcv(_bars(index, random_walk(len(index), seed=2)), '60min')
+    assert [ts.strftime('%H:%M') for ts in hourly.index[:7]] == ['09:30', '10:30', '11:30', '12:30', '13:30', '14:30', '15:30']
+    assert len(hourly) == 14
+
+def test_weekly_history_reuses_daily_download(analyzer):
+    a = analyzer
+    calls, download = [], a._download_history
+    a._download_history = lambda *args: calls.append(args) or download(*args)
+    daily, _ = a.fetch_data('AAPL', period='1y')
+    weekly, err = a.fetch_data('AAPL', period='1y', interval='1wk')
+    again, _ = a.fetch_data('AAPL', period='1y', interval='1wk')
+    assert err is None and len(weekly) < len(daily) / 4
+    assert weekly['Close'].iloc[-1] == daily['Close'].iloc[-1]
+    assert {interval for _, _, interval in calls} == {'1d'} and again.equals(weekly)
+    assert a._resampled.hits == 1
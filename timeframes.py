@@ -0,0 +1,67 @@
+import re
+
+INTRADAY_INTERVALS = ('1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h')
+
+# Longest lookback Yahoo serves per intraday interval (days)
+INTRADAY_LIMITS = {'1m': 7, '2m': 60, '5m': 60, '15m': 60, '30m': 60, '60m': 730, '90m': 60, '1h': 730}
+
+# interval -> (finer interval it is derived from, resample rule). Weekly bars are labelled by their
+# Monday like Yahoo's; intraday bins are anchored at the first bar so they start at the session open.
+DERIVED = {
+    '1wk': ('1d', 'W-MON'),
+    '1mo': ('1d', 'MS'),
+    '3mo': ('1d', 'QS'),
+    '15m': ('5m', '15min'),
+    '30m': ('5m', '30min'),
+    '60m': ('5m', '60min'),
+    '1h': ('5m', '60min'),
+}
+
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum',
+             'Dividends': 'sum', 'Stock Splits': 'max'}
+
+_PERIOD = re.compile(r'^(\d+)(d|mo|y)$')
+_PERIOD_DAYS = {'d': 1, 'mo': 31, 'y': 366}
+
+def is_intraday(interval):
+    return interval in INTRADAY_INTERVALS
+
+def period_days(period):
+    """Upper bound of calendar days a yfinance period spans; None for 'max'."""
+    if period == 'ytd': return 366
+    m = _PERIOD.match(period)
+    return int(m.group(1)) * _PERIOD_DAYS[m.group(2)] if m else None
+
+def clamp_period(period, interval):
+    """Shortens a period to what Yahoo serves for an intraday interval (e.g. 1y of 5m bars -> 60d)."""
+    limit = INTRADAY_LIMITS.get(interval)
+    if limit is None: return period
+    days = period_days(period)
+    return period if days is not None and days <= limit else f"{limit}d"
+
+def plan(period, interval):
+    """(source interval to download, resample rule or None) for a requested period/interval.
+
+    Coarser bars come from the finer series already fetched (and stored) for the same ticker, unless
+    Yahoo can't serve the finer interval for that long a period.
+    """
+    source, rule = DERIVED.get(interval, (interval, None))
+    if rule is None: return interval, None
+    limit = INTRADAY_LIMITS.get(source)
+    days = period_days(period)
+    if limit is not None and (days is None or days > limit):
+        return interval, None
+    return source, rule
+
+def resample_ohlcv(df, rule):
+    """OHLCV bars aggregated to `rule`; bins without any trades are dropped."""
+    agg = {c: f for c, f in OHLCV_AGG.items() if c in df.columns}
+    origin = 'start' if rule.endswith('min') else 'start_day'
+    kwargs = {'label': 'left', 'closed': 'left'} if rule.startswith('W-') else {'origin': origin}
+    out = df.resample(rule, **kwargs).agg(agg)
+    return out[out['Close'].notna()] if 'Close' in out.columns else out.dropna(how='all')
+
+def frame_version(df):
+    """Changes whenever the bars would change: length, range and the (live-patched) last bar."""
+    last = df.iloc[-1]
+    return (len(df), df.index[0], df.index[-1], float(last['Close']), float(last.get('Volume', 0)))